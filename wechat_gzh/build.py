@@ -108,10 +108,7 @@ def copy_user_files(project_root: Path, dist_dir: Path):
             print(f"复制配置文件: {src} -> {dest}")
             shutil.copy2(src, dest)
     
-    # 创建空的历史记录文件
-    history_file = config_dest / 'comment_history.json'
-    if not history_file.exists():
-        history_file.write_text('{}', encoding='utf-8')
+    # 历史记录文件不预先创建：首次运行时自动创建，并导入同目录下旧版 comment_history.json
     
     # 创建 logs 目录
     logs_dir = dist_dir / 'logs'
@@ -173,7 +170,7 @@ def create_readme_for_users(dist_dir: Path):
 ├── config/                   # 配置文件目录
 │   ├── calibration.json     # 坐标校准配置
 │   ├── task_prompt.json     # AI 提示词配置
-│   └── comment_history.json # 评论历史记录
+│   └── comment_history.jsonl # 评论历史记录（首次运行时生成）
 └── logs/                     # 日志目录
 ```
 
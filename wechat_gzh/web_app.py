@@ -199,6 +199,7 @@ class WebApp:
             return
             
         def _verify():
+            bot = None
             try:
                 logging.info("正在生成校验截图...")
                 bot = AutoCommentBot(verify_only=True)
@@ -207,10 +208,14 @@ class WebApp:
             except Exception as e:
                 logging.error(f"校验失败: {e}")
                 self._safe_notify(f"校验失败: {e}", "negative")
+            finally:
+                if bot is not None:
+                    bot.close()
 
         threading.Thread(target=_verify, daemon=True).start()
 
     def _run_bot_logic(self):
+        bot = None
         try:
             logging.info("正在初始化机器人... (这可能需要几秒钟启动 Ollama)")
             bot = AutoCommentBot()
@@ -218,6 +223,8 @@ class WebApp:
         except Exception as e:
             logging.error(f"运行出错: {e}")
         finally:
+            if bot is not None:
+                bot.close()
             self.is_running = False
             # 在结束时手动更新一次 UI 状态
             self._update_ui_state()
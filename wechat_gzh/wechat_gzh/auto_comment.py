@@ -9,7 +9,7 @@
 注意事项：
 - 移动鼠标到屏幕左上角可以紧急中断程序
 - 按 Ctrl+C 可以随时停止
-- 处理记录会保存到 logs/comment_history.json
+- 处理记录会保存到 config/comment_history.jsonl
 - 校准配置会保存到 config/calibration.json
 """
 
@@ -30,7 +30,7 @@ import pyautogui
 from PIL import Image
 
 from .config import COMMENT_TEXT, CONFIG_DIR, HISTORY_FILE, LOG_DIR, TIMING
-from .automation.navigator import Navigator, SCREEN_SCALE
+from .automation.navigator import Navigator, log_screen_scale, screen_scale
 from .automation.commenter import Commenter
 from .automation.ocr import OCRReader
 from .automation.calibration import CalibrationManager, CalibrationData
@@ -95,6 +95,11 @@ class AutoCommentBot:
         self.failed_accounts = []
         self.no_comment_accounts = []
     
+    def close(self) -> None:
+        """释放机器人持有的资源（历史记录文件句柄、OCR 磁盘缓存），同一进程中再次创建机器人前调用"""
+        self.history.close()
+        self.ocr.close()
+    
     def check_prerequisites(self) -> bool:
         """
         检查前置条件（由用户手动确保微信已打开）
@@ -263,8 +268,8 @@ class AutoCommentBot:
             
         draw = ImageDraw.Draw(screenshot)
         line_width = 3
-        # 截图为物理像素（Retina 2x），传入坐标为逻辑，需乘以 SCREEN_SCALE 再绘制
-        s = SCREEN_SCALE
+        # 截图为物理像素（Retina 2x），传入坐标为逻辑，需乘以缩放比例再绘制
+        s = screen_scale()
         
         # 标注点击位置（红色十字）
         if mark_position:
@@ -351,7 +356,7 @@ class AutoCommentBot:
             # 点击公众号
             self.logger.info(f"正在点击第 {index + 1} 个公众号...")
             self.navigator.click_account_at_index(index)
-            time.sleep(TIMING["page_load_wait"])
+            time.sleep(TIMING.page_load_wait)
             
             # 截图：点击公众号后（标注 OCR 公众号名称区域）
             self._save_debug_screenshot(
@@ -396,7 +401,7 @@ class AutoCommentBot:
             # 点击最新文章
             self.logger.info("点击最新文章...")
             self.navigator.click_first_article()
-            time.sleep(TIMING["article_load_wait"])
+            time.sleep(TIMING.article_load_wait)
             
             # 截图：点击文章后（标注 OCR 文章标题区域）
             # 同时用于比较点击是否生效
@@ -490,8 +495,8 @@ class AutoCommentBot:
             # 继续留言流程（跳过滚动，因为已经滚动过了）
             success = self.commenter.leave_comment(
                 comment_text,
-                TIMING["comment_wait_min"],
-                TIMING["comment_wait_max"],
+                TIMING.comment_wait_min,
+                TIMING.comment_wait_max,
                 skip_scroll=True
             )
             
@@ -642,8 +647,8 @@ class AutoCommentBot:
                 # 随机等待（可中断）
                 self.logger.info(f"随机等待中...")
                 wait_time = random_sleep(
-                    TIMING["account_interval_min"],
-                    TIMING["account_interval_max"]
+                    TIMING.account_interval_min,
+                    TIMING.account_interval_max
                 )
                 self.logger.info(f"等待了 {wait_time:.1f} 秒")
                 
@@ -692,14 +697,17 @@ class AutoCommentBot:
                     # 随机等待
                     self.logger.info(f"随机等待中...")
                     wait_time = random_sleep(
-                        TIMING["account_interval_min"],
-                        TIMING["account_interval_max"]
+                        TIMING.account_interval_min,
+                        TIMING.account_interval_max
                     )
                     self.logger.info(f"等待了 {wait_time:.1f} 秒")
         
         except KeyboardInterrupt:
             self.logger.info("\n用户中断，停止处理")
         
+        # 保存尚未写盘的历史记录
+        self.history.flush()
+        
         # 打印汇总
         self.print_summary()
     
@@ -741,12 +749,13 @@ class AutoCommentBot:
         def _list_mode_recognize_one(list_index: int, debug_index: int) -> str:
             """点击列表指定项 -> 进入公众号 -> 截图裁 OCR 区域 -> 识别名称 -> 返回列表。返回识别到的公众号名。"""
             self.navigator.click_account_at_index(list_index)
-            time.sleep(TIMING["page_load_wait"])
+            time.sleep(TIMING.page_load_wait)
             base_image = pyautogui.screenshot()
-            px = int(self.ocr.account_name_x * SCREEN_SCALE)
-            py = int(self.ocr.account_name_y * SCREEN_SCALE)
-            pw = int(self.ocr.account_name_width * SCREEN_SCALE)
-            ph = int(self.ocr.account_name_height * SCREEN_SCALE)
+            scale = screen_scale()
+            px = int(self.ocr.account_name_x * scale)
+            py = int(self.ocr.account_name_y * scale)
+            pw = int(self.ocr.account_name_width * scale)
+            ph = int(self.ocr.account_name_height * scale)
             crop_image = base_image.crop((px, py, px + pw, py + ph))
             if self.enable_debug_screenshot:
                 ocr_account_region = (
@@ -1006,12 +1015,16 @@ def main():
     print("    （校准阶段直接退出，主循环阶段会等待当前操作完成）")
     print()
     
+    log_screen_scale()
+    print()
+    
     # response = input("准备好后按 Enter 继续，输入 'q' 退出: ")
     # if response.lower() == 'q':
     #     print("已退出")
     #     return 0
     
     
+    bot = None
     try:
         bot = AutoCommentBot(
             verify_only=args.verify,
@@ -1035,6 +1048,9 @@ def main():
     except Exception as e:
         print(f"\n程序出错: {e}")
         return 1
+    finally:
+        if bot is not None:
+            bot.close()
     
     return 0
 
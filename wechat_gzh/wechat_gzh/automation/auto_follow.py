@@ -16,29 +16,25 @@
 4. 继续循环
 """
 
+import hashlib
 import json
 import os
 import platform
 import random
+import string
 import time
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pyautogui
-import pyperclip
 from PIL import Image, ImageDraw
 
-from .navigator import SCREEN_SCALE
-from .utils import interrupt_handler, interruptible_sleep
-
-# 尝试导入 CnOcr
-try:
-    from cnocr import CnOcr
-    HAS_CNOCR = True
-except ImportError:
-    HAS_CNOCR = False
-    CnOcr = None  # type: ignore
+from .navigator import log_screen_scale, screen_scale
+from .ocr_singleton import downscale_for_ocr, get_ocr
+from .utils import copy_to_clipboard, interrupt_handler, interruptible_sleep
 
 # 获取项目目录
 MODULE_DIR = Path(__file__).parent
@@ -46,6 +42,14 @@ PROJECT_DIR = MODULE_DIR.parent.parent
 ASSETS_DIR = PROJECT_DIR / "assets"
 CONFIG_DIR = PROJECT_DIR / "config"
 
+# 名称比较时保留的字符：中文（\u4e00-\u9fa5）、英文、数字
+_NAME_CHARS = frozenset(
+    string.ascii_letters + string.digits + "".join(chr(c) for c in range(0x4E00, 0x9FA6))
+)
+
+# OCR 截图长边超过此值（像素）时才按 ocr_downscale 缩小，小区域原样识别
+OCR_DOWNSCALE_MIN_SIDE = 800
+
 # followees 来源文件（多个公众号的关注列表）
 FOLLOWEES_SOURCE_FILES = [
     "followees_20260207_ririshengjinririfu.json",
@@ -55,7 +59,12 @@ FOLLOWEES_SOURCE_FILES = [
 
 
 class AutoFollower:
-    """自动关注公众号类"""
+    """
+    自动关注公众号类
+    
+    CnOcr 在首次需要识别时才导入并初始化（约 1-2 秒、数百 MB 内存），
+    导入本模块本身不再加载模型；代价是第一次识别（包括 --verify 的识别测试）会稍慢。
+    """
     
     # 搜一搜输入框图片（支持多个备选）
     SEARCH_INPUT_IMAGES = [
@@ -81,6 +90,9 @@ class AutoFollower:
         "shipinghao.png",
     ]
     
+    # 使用缓存标签坐标前，在其周围此范围内（逻辑像素，半宽/半高）确认标签图片仍在原处
+    TAB_VERIFY_HALF_SIZE = (100, 40)
+    
     # 关注按钮图片
     FOLLOW_BUTTON_IMAGES = [
         "guanzhu.png",
@@ -90,6 +102,9 @@ class AutoFollower:
     # 搜一搜 logo 图片
     SEARCH_LOGO_IMAGE = "souyisou_logo.png"
     
+    # OCR 结果缓存条数上限
+    OCR_CACHE_SIZE = 16
+    
     def __init__(self, confidence: float = 0.8, wechat_account: str = "mia"):
         """
         初始化自动关注器
@@ -108,13 +123,15 @@ class AutoFollower:
         # 记录上次点击公众号标签的位置（用于计算卡片位置）
         self._last_gzh_tab_pos: Optional[Tuple[int, int]] = None
         
-        # OCR 相关
+        # 标签坐标缓存：同一会话内标签位置不变，首次识别后直接点击，屏幕尺寸变化时失效
+        self._tab_pos_cache: Dict[str, Tuple[int, int]] = {}
+        self._tab_cache_screen_size: Optional[Tuple[int, int]] = None
+        
+        # OCR 相关（懒加载，见 _get_ocr）
         self._ocr = None
-        if HAS_CNOCR:
-            self._ocr = CnOcr(det_model_name='ch_PP-OCRv3_det')
-            print("✓ CnOcr 初始化成功")
-        else:
-            print("⚠ CnOcr 未安装，OCR 功能不可用")
+        self._ocr_loaded = False
+        # OCR 结果缓存：截图内容哈希 -> 识别名称（LRU，同一卡片区域未变化时不重复推理）
+        self._ocr_cache: "OrderedDict[bytes, str]" = OrderedDict()
         
         # 搜一搜公众号/视频号第一个卡片 OCR 区域（逻辑坐标，与 pyautogui.size() 一致；Retina 下校对时按“点”量）
         self.searched_gzh_x = 800
@@ -125,6 +142,9 @@ class AutoFollower:
         # 账号标签 Y 上限（逻辑坐标）：超过则视为误匹配，位置错误
         self.account_tab_y_max = 250
         
+        # OCR 前的缩小倍数：卡片名称字体较大，缩小后识别基本无损，检测网络计算量按像素数下降
+        self.ocr_downscale = 2
+        
         # 加载校准配置
         self._load_calibration()
         
@@ -156,51 +176,82 @@ class AutoFollower:
             if "account_tab_y_max" in ocr_config:
                 self.account_tab_y_max = int(ocr_config["account_tab_y_max"])
                 print(f"✓ 账号标签 Y 上限: {self.account_tab_y_max}")
+            if "ocr_downscale" in ocr_config:
+                self.ocr_downscale = max(1, int(ocr_config["ocr_downscale"]))
+                print(f"✓ OCR 缩小倍数: {self.ocr_downscale}")
         except Exception as e:
             print(f"⚠ 加载校准配置出错: {e}")
     
-    def _capture_region(self, x: int, y: int, width: int, height: int) -> Image.Image:
+    def _capture_region(self, x: int, y: int, width: int, height: int) -> np.ndarray:
         """
-        截取屏幕指定区域。配置为逻辑坐标；Retina 下 region 与截图像素一致，需乘以 SCREEN_SCALE。
+        截取屏幕指定区域。配置为逻辑坐标；Retina 下 region 与截图像素一致，需乘以缩放比例。
         
         Args:
             x, y: 左上角逻辑坐标
             width, height: 宽高（逻辑）
             
         Returns:
-            PIL Image 对象
+            (H, W, 3) uint8 数组，可直接送入 CnOcr
         """
-        physical_x = int(x * SCREEN_SCALE)
-        physical_y = int(y * SCREEN_SCALE)
-        physical_width = int(width * SCREEN_SCALE)
-        physical_height = int(height * SCREEN_SCALE)
-        return pyautogui.screenshot(region=(physical_x, physical_y, physical_width, physical_height))
+        scale = screen_scale()
+        physical_x = int(x * scale)
+        physical_y = int(y * scale)
+        physical_width = int(width * scale)
+        physical_height = int(height * scale)
+        # macOS 截图可能带 alpha 通道，统一转为 RGB 三通道
+        screenshot = pyautogui.screenshot(region=(physical_x, physical_y, physical_width, physical_height))
+        return np.asarray(screenshot.convert("RGB"))
     
-    def _recognize_text(self, image: Image.Image) -> str:
+    def _get_ocr(self):
+        """
+        获取 CnOcr 实例，首次调用时才导入并初始化
+        
+        Returns:
+            CnOcr 实例，未安装时返回 None
+        """
+        if not self._ocr_loaded:
+            self._ocr_loaded = True
+            self._ocr = get_ocr()
+            if self._ocr is None:
+                print("⚠ CnOcr 未安装，OCR 功能不可用")
+            else:
+                print("✓ CnOcr 初始化成功")
+        return self._ocr
+    
+    def _recognize_text(self, image: np.ndarray, first_line_only: bool = False) -> str:
         """
         使用 CnOcr 识别图像中的文字
         
         Args:
-            image: PIL Image 对象
+            image: (H, W, 3) uint8 数组（CnOcr 直接接受 numpy，省去 PIL 转换）
+            first_line_only: 只返回第一行非空文字（CnOcr 结果按从上到下排列），
+                省去整段拼接再按行拆分
             
         Returns:
             识别出的文字
         """
-        if not self._ocr:
+        ocr = self._get_ocr()
+        if not ocr:
             return ""
         
         try:
-            results = self._ocr.ocr(image)
-            text_lines = [item['text'] for item in results if item.get('text')]
-            return "\n".join(text_lines).strip()
+            results = ocr.ocr(image)
+            if first_line_only:
+                for item in results:
+                    text = (item.get('text') or "").strip()
+                    if text:
+                        return text
+                return ""
+            return "\n".join(t for t in (item.get('text') for item in results) if t).strip()
         except Exception as e:
             print(f"  OCR 识别出错: {e}")
             return ""
     
-    def _capture_ocr_region(self) -> Optional[Image.Image]:
+    def _capture_ocr_region(self) -> Optional[np.ndarray]:
         """
         截取当前 OCR 识别区域（搜一搜第一个卡片名称区域）。
         校准配置为逻辑坐标，pyautogui.screenshot(region=) 使用逻辑坐标，直接传配置值。
+        返回 numpy 数组，直接送入 CnOcr，避免 CnOcr 内部再做一次 PIL → numpy 拷贝。
         """
         try:
             logical_x = int(self.searched_gzh_x)
@@ -212,19 +263,28 @@ class AutoFollower:
             logical_y = max(0, min(logical_y, screen_h - 1))
             logical_w = max(1, min(logical_w, screen_w - logical_x))
             logical_h = max(1, min(logical_h, screen_h - logical_y))
-            return pyautogui.screenshot(region=(logical_x, logical_y, logical_w, logical_h))
+            # macOS 截图可能带 alpha 通道，统一转为 RGB 三通道
+            screenshot = pyautogui.screenshot(region=(logical_x, logical_y, logical_w, logical_h))
+            image = screenshot.convert("RGB")
+            # 大区域按 ocr_downscale 缩小后再推理
+            if self.ocr_downscale > 1 and max(image.size) > OCR_DOWNSCALE_MIN_SIDE:
+                image = downscale_for_ocr(image, max_height=max(1, image.height // self.ocr_downscale))
+            return np.asarray(image)
         except Exception as e:
             print(f"  OCR 区域截图出错: {e}")
             return None
 
-    def recognize_searched_gzh_name(self) -> str:
+    def recognize_searched_gzh_name(self, debug: bool = False) -> str:
         """
         识别搜索结果中第一个公众号卡片的名称
+        
+        Args:
+            debug: 是否识别并打印区域内全部文字（默认只取第一行）
             
         Returns:
             识别出的公众号名称
         """
-        if not self._ocr:
+        if not self._get_ocr():
             print("  ⚠ OCR 未初始化，跳过名称验证")
             return ""
         
@@ -233,12 +293,27 @@ class AutoFollower:
             if image is None:
                 return ""
 
-            # 识别文字
-            text = self._recognize_text(image)
+            # 截图内容未变化（如重试、公众号/视频号两次校验同一区域）时直接复用上次结果
+            key = hashlib.blake2b(image.tobytes(), digest_size=8).digest()
+            if key in self._ocr_cache:
+                self._ocr_cache.move_to_end(key)
+                name = self._ocr_cache[key]
+                if name:
+                    print(f"  🔍 OCR 识别卡片名称(缓存): 【{name}】")
+                return name
+
+            # 识别文字，只需要第一行
+            if debug:
+                text = self._recognize_text(image)
+                print(f"  🔍 OCR 区域全部文字: {text!r}")
+                lines = [line.strip() for line in text.split('\n') if line.strip()]
+                name = lines[0] if lines else ""
+            else:
+                name = self._recognize_text(image, first_line_only=True)
             
-            # 清理：取第一行
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            name = lines[0] if lines else ""
+            self._ocr_cache[key] = name
+            if len(self._ocr_cache) > self.OCR_CACHE_SIZE:
+                self._ocr_cache.popitem(last=False)
             
             if name:
                 print(f"  🔍 OCR 识别卡片名称: 【{name}】")
@@ -253,17 +328,18 @@ class AutoFollower:
         """
         标准化名称用于比较（去除空格和特殊字符）
         
+        使用 filter + frozenset 成员判断（C 层逐字符查表），比 re.sub 字符类替换更快。
+        
         Args:
             name: 原始名称
             
         Returns:
             标准化后的名称
         """
-        import re
         if not name:
             return ""
         # 去除空格、标点符号，只保留中文、英文、数字
-        return re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9]', '', name)
+        return "".join(filter(_NAME_CHARS.__contains__, name))
     
     def verify_gzh_card_name(self, expected_name: str, context: str = "公众号") -> bool:
         """
@@ -276,7 +352,7 @@ class AutoFollower:
         Returns:
             是否匹配
         """
-        if not self._ocr:
+        if not self._get_ocr():
             # 没有 OCR 功能
             return False
         
@@ -323,7 +399,7 @@ class AutoFollower:
         name = f"ocr_mismatch_{context}_期望{safe(expected)}_识别{safe(recognized)}_{timestamp}.png"
         path = logs_dir / name
         try:
-            crop.save(str(path))
+            Image.fromarray(crop).save(str(path))
             print(f"  📷 已保存 OCR 区域截图便于核对: {path}")
             print(f"  📐 当前 OCR 区域(逻辑): x={self.searched_gzh_x}, y={self.searched_gzh_y}, "
                   f"w={self.searched_gzh_width}, h={self.searched_gzh_height} (calibration searched_gongzhonghao_*)")
@@ -385,8 +461,9 @@ class AutoFollower:
             if box:
                 # box is (left, top, width, height) in physical pixels
                 # convert to logical coordinates
-                x = int((box.left + box.width / 2) / SCREEN_SCALE)
-                y = int((box.top + box.height / 2) / SCREEN_SCALE)
+                scale = screen_scale()
+                x = int((box.left + box.width / 2) / scale)
+                y = int((box.top + box.height / 2) / scale)
                 return (x, y)
         except pyautogui.ImageNotFoundException:
             pass
@@ -412,6 +489,105 @@ class AutoFollower:
                     return pos
         return None
     
+    def _screen_probe(self) -> bytes:
+        """截取屏幕中心 32x32 小块并返回其哈希，用于快速判断画面是否变化"""
+        screen_w, screen_h = pyautogui.size()
+        patch = self._capture_region(screen_w // 2 - 16, screen_h // 2 - 16, 32, 32)
+        return hashlib.blake2b(patch.tobytes(), digest_size=8).digest()
+    
+    def _wait_for_ui_change(self, timeout: float) -> None:
+        """
+        等待画面变化，最多等待 timeout 秒
+        
+        从 0.1 秒开始指数退避轮询屏幕中心小块的哈希，一旦变化立即返回，
+        UI 响应快时不必等满固定的重试间隔。
+        
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        try:
+            baseline = self._screen_probe()
+        except Exception:
+            time.sleep(timeout)
+            return
+        
+        elapsed = 0.0
+        delay = 0.1
+        while elapsed < timeout:
+            interrupt_handler.check()
+            step = min(delay, timeout - elapsed)
+            time.sleep(step)
+            elapsed += step
+            delay *= 2
+            try:
+                if self._screen_probe() != baseline:
+                    return
+            except Exception:
+                pass
+    
+    def _click_cached_tab(self, key: str, image_names: List[str]) -> Optional[Tuple[int, int]]:
+        """
+        在缓存坐标附近的小区域内确认标签图片后点击，省去 locateOnScreen 全屏搜索
+        
+        附近找不到标签图片（页面布局变化、被遮挡等）时清除该缓存，由调用方回退到全屏识别。
+        
+        Args:
+            key: 标签缓存键
+            image_names: 标签的备选图片文件名
+            
+        Returns:
+            命中时返回标签坐标，否则返回 None
+        """
+        screen_size = tuple(pyautogui.size())
+        if screen_size != self._tab_cache_screen_size:
+            self._tab_pos_cache.clear()
+            self._tab_cache_screen_size = screen_size
+        
+        pos = self._tab_pos_cache.get(key)
+        if not pos:
+            return None
+        
+        # 搜索区域为截图（物理像素）坐标
+        scale = screen_scale()
+        half_w, half_h = self.TAB_VERIFY_HALF_SIZE
+        region = (
+            max(0, int((pos[0] - half_w) * scale)),
+            max(0, int((pos[1] - half_h) * scale)),
+            int(2 * half_w * scale),
+            int(2 * half_h * scale),
+        )
+        for img in image_names:
+            if (self.asset_dir / img).exists():
+                found = self._locate(img, region)
+                if found:
+                    print(f"  ✓ 点击缓存标签位置: {found}")
+                    self._click_with_offset(*found)
+                    return found
+        
+        print(f"  ⚠ 缓存标签位置附近未找到标签，重新识别")
+        self._tab_pos_cache.pop(key, None)
+        return None
+    
+    def _click_with_offset(self, x: int, y: int, jitter: int = 3) -> Tuple[int, int]:
+        """
+        添加随机偏移后移动并点击（逻辑坐标）
+        
+        带 duration 的 moveTo 本身已给 UI 留出反应时间，移动结束后直接在当前位置 click，
+        不再额外 sleep 和重复传坐标。
+        
+        Args:
+            x, y: 目标逻辑坐标
+            jitter: 随机偏移范围（像素），模拟真人
+            
+        Returns:
+            实际点击的坐标
+        """
+        click_x = x + random.randint(-jitter, jitter)
+        click_y = y + random.randint(-jitter, jitter)
+        pyautogui.moveTo(click_x, click_y, duration=0.2)
+        pyautogui.click()
+        return (click_x, click_y)
+    
     def _find_and_click(
         self, 
         image_names: List[str], 
@@ -437,19 +613,12 @@ class AutoFollower:
             pos = self._locate_multiple(image_names)
             if pos:
                 print(f"  ✓ 找到 {desc} 位置: {pos}")
-                # 添加随机偏移，模拟真人
-                offset_x = random.randint(-3, 3)
-                offset_y = random.randint(-3, 3)
-                click_x = pos[0] + offset_x
-                click_y = pos[1] + offset_y
-                pyautogui.moveTo(click_x, click_y, duration=0.3)
-                time.sleep(0.2)
-                pyautogui.click(click_x, click_y)
+                self._click_with_offset(*pos)
                 return pos
             
             if i < retry - 1:
                 print(f"  未找到 {desc}，重试 ({i + 1}/{retry})...")
-                time.sleep(wait)
+                self._wait_for_ui_change(wait)
         
         print(f"  ✗ 未找到 {desc}")
         return None
@@ -495,6 +664,7 @@ class AutoFollower:
         if not merged:
             print("✗ 未从任何 followees 源文件加载到用户")
             self._all_users = []
+            self._users_by_openid = {}
             self._followees_path = CONFIG_DIR / f"followed_by_followee_{self.wechat_account}.json"
             return []
         print(f"✓ 合并去重共 {len(merged)} 人")
@@ -534,6 +704,8 @@ class AutoFollower:
 
         self._followees_path = result_path
         self._all_users = merged
+        # openid -> user 索引，update_user_* 按 openid 直接定位，避免每次线性扫描
+        self._users_by_openid = {u.get("user_openid", ""): u for u in merged}
         self.save_followees()
         print(f"✓ 当前待处理列表共 {len(self._all_users)} 人，已保存到 {result_path.resolve()}")
         return self._all_users
@@ -552,15 +724,14 @@ class AutoFollower:
             user_openid: 用户的 openid
             followed: 是否已关注
         """
-        if not hasattr(self, '_all_users'):
+        if not hasattr(self, '_users_by_openid'):
             return
         
-        for user in self._all_users:
-            if user.get("user_openid") == user_openid:
-                user["followed"] = followed
-                self.save_followees()
-                print(f"  💾 已保存关注状态: {user.get('user_name')}")
-                break
+        user = self._users_by_openid.get(user_openid)
+        if user:
+            user["followed"] = followed
+            self.save_followees()
+            print(f"  💾 已保存关注状态: {user.get('user_name')}")
     
     def update_user_handled(self, user_openid: str, handled: bool = True) -> None:
         """
@@ -570,14 +741,13 @@ class AutoFollower:
             user_openid: 用户的 openid
             handled: 是否已处理
         """
-        if not hasattr(self, '_all_users'):
+        if not hasattr(self, '_users_by_openid'):
             return
         
-        for user in self._all_users:
-            if user.get("user_openid") == user_openid:
-                user["handled"] = handled
-                self.save_followees()
-                break
+        user = self._users_by_openid.get(user_openid)
+        if user:
+            user["handled"] = handled
+            self.save_followees()
     
     def countdown(self, seconds: int = 5) -> None:
         """
@@ -615,7 +785,7 @@ class AutoFollower:
         time.sleep(0.1)
         
         # 3. 输入用户名（使用剪贴板）
-        pyperclip.copy(user_name)
+        copy_to_clipboard(user_name)
         pyautogui.hotkey(modifier, "v")
         time.sleep(0.3)
         
@@ -635,13 +805,17 @@ class AutoFollower:
         Returns:
             是否成功
         """
+        if self._click_cached_tab("account", self.ACCOUNT_TAB_IMAGES):
+            time.sleep(1.0)
+            return True
+        
         for i in range(3):
             interrupt_handler.check()
             pos = self._locate_multiple(self.ACCOUNT_TAB_IMAGES)
             if not pos:
                 if i < 2:
                     print(f"  未找到 账号标签，重试 ({i + 1}/3)...")
-                    time.sleep(1.0)
+                    self._wait_for_ui_change(1.0)
                 else:
                     print(f"  ✗ 未找到 账号标签")
                 continue
@@ -649,13 +823,8 @@ class AutoFollower:
                 print(f"  ✗ 账号标签位置错误: Y 超出阈值 (y={pos[1]}, 阈值={self.account_tab_y_max})，未点击")
                 return False
             print(f"  ✓ 找到 账号标签 位置: {pos}")
-            offset_x = random.randint(-3, 3)
-            offset_y = random.randint(-3, 3)
-            click_x = pos[0] + offset_x
-            click_y = pos[1] + offset_y
-            pyautogui.moveTo(click_x, click_y, duration=0.3)
-            time.sleep(0.2)
-            pyautogui.click(click_x, click_y)
+            self._click_with_offset(*pos)
+            self._tab_pos_cache["account"] = pos
             time.sleep(1.0)
             return True
         return False
@@ -667,9 +836,10 @@ class AutoFollower:
         Returns:
             是否成功
         """
-        pos = self._find_and_click(self.GZH_TAB_IMAGES, "公众号标签")
+        pos = self._click_cached_tab("gzh", self.GZH_TAB_IMAGES) or self._find_and_click(self.GZH_TAB_IMAGES, "公众号标签")
         if not pos:
             return False
+        self._tab_pos_cache["gzh"] = pos
         
         # 记录公众号标签位置，用于后续点击卡片
         self._last_gzh_tab_pos = pos
@@ -683,9 +853,10 @@ class AutoFollower:
         Returns:
             是否成功
         """
-        pos = self._find_and_click(self.SHIPINGHAO_TAB_IMAGES, "视频号标签")
+        pos = self._click_cached_tab("shipinghao", self.SHIPINGHAO_TAB_IMAGES) or self._find_and_click(self.SHIPINGHAO_TAB_IMAGES, "视频号标签")
         if not pos:
             return False
+        self._tab_pos_cache["shipinghao"] = pos
         
         time.sleep(1.0)
         return True
@@ -706,13 +877,7 @@ class AutoFollower:
         
         print(f"  → 点击卡片位置(逻辑): ({card_x}, {card_y})")
         
-        # 添加随机偏移
-        offset_x = random.randint(-3, 3)
-        offset_y = random.randint(-3, 3)
-        
-        pyautogui.moveTo(card_x + offset_x, card_y + offset_y, duration=0.3)
-        time.sleep(0.2)
-        pyautogui.click(card_x + offset_x, card_y + offset_y)
+        self._click_with_offset(card_x, card_y)
         
         time.sleep(2.0)
         return True
@@ -772,10 +937,11 @@ class AutoFollower:
             if box:
                 # box is (left, top, width, height) in physical pixels
                 # convert to logical coordinates
-                left = int(box.left / SCREEN_SCALE)
-                top = int(box.top / SCREEN_SCALE)
-                width = int(box.width / SCREEN_SCALE)
-                height = int(box.height / SCREEN_SCALE)
+                scale = screen_scale()
+                left = int(box.left / scale)
+                top = int(box.top / scale)
+                width = int(box.width / scale)
+                height = int(box.height / scale)
                 return (left, top, width, height)
         except pyautogui.ImageNotFoundException:
             pass
@@ -813,12 +979,13 @@ class AutoFollower:
                 draw = ImageDraw.Draw(full_screen)
                 
                 # 转换为物理像素坐标用于绘制
-                box_physical_left = int(left * SCREEN_SCALE)
-                box_physical_top = int(top * SCREEN_SCALE)
-                box_physical_width = int(width * SCREEN_SCALE)
-                box_physical_height = int(height * SCREEN_SCALE)
-                click_physical_x = int(final_click_x * SCREEN_SCALE)
-                click_physical_y = int(final_click_y * SCREEN_SCALE)
+                scale = screen_scale()
+                box_physical_left = int(left * scale)
+                box_physical_top = int(top * scale)
+                box_physical_width = int(width * scale)
+                box_physical_height = int(height * scale)
+                click_physical_x = int(final_click_x * scale)
+                click_physical_y = int(final_click_y * scale)
                 
                 # 绘制 close_gzh.png 的 box（绿色框）
                 draw.rectangle(
@@ -862,9 +1029,8 @@ class AutoFollower:
             except Exception as e:
                 print(f"  ⚠ 调试截图失败: {e}")
             
-            pyautogui.moveTo(final_click_x, final_click_y, duration=0.3)
-            time.sleep(0.2)
-            pyautogui.click(final_click_x, final_click_y)
+            pyautogui.moveTo(final_click_x, final_click_y, duration=0.2)
+            pyautogui.click()
             print(f"  → 关闭公众号弹窗 (点击位置: ({final_click_x}, {final_click_y}))")
             time.sleep(1.5)  # 等待弹窗关闭
         else:
@@ -1010,11 +1176,12 @@ class AutoFollower:
             full_screen = pyautogui.screenshot()
             draw = ImageDraw.Draw(full_screen)
             
-            # 配置为逻辑坐标，全屏截图为物理像素，需乘以 SCREEN_SCALE 再绘制
-            px = int(self.searched_gzh_x * SCREEN_SCALE)
-            py = int(self.searched_gzh_y * SCREEN_SCALE)
-            pw = int(self.searched_gzh_width * SCREEN_SCALE)
-            ph = int(self.searched_gzh_height * SCREEN_SCALE)
+            # 配置为逻辑坐标，全屏截图为物理像素，需乘以缩放比例再绘制
+            scale = screen_scale()
+            px = int(self.searched_gzh_x * scale)
+            py = int(self.searched_gzh_y * scale)
+            pw = int(self.searched_gzh_width * scale)
+            ph = int(self.searched_gzh_height * scale)
             
             # 绘制红色矩形框标记 OCR 区域（换算到物理像素以匹配截图）
             draw.rectangle(
@@ -1041,16 +1208,16 @@ class AutoFollower:
             
             print(f"\n✓ 验证截图已保存: {output_path}")
             print("\n请检查截图中的标注位置是否正确：")
-            print(f"  - 红色框: 公众号/视频号第一个卡片名称 OCR 识别区域（逻辑坐标 ×{SCREEN_SCALE} 后绘制）")
+            print(f"  - 红色框: 公众号/视频号第一个卡片名称 OCR 识别区域（逻辑坐标 ×{screen_scale()} 后绘制）")
             print(f"  - 区域配置(逻辑坐标): x={self.searched_gzh_x}, y={self.searched_gzh_y}, "
                   f"w={self.searched_gzh_width}, h={self.searched_gzh_height}")
             config_file = "calibration-win.json" if platform.system() == "Windows" else "calibration.json"
             print(f"\n如需调整，请编辑 config/{config_file} 中的 searched_gongzhonghao_*（逻辑坐标，与屏幕“点”一致）")
             
             # 同时进行 OCR 识别测试
-            if self._ocr:
+            if self._get_ocr():
                 print("\n正在测试 OCR 识别...")
-                name = self.recognize_searched_gzh_name()
+                name = self.recognize_searched_gzh_name(debug=True)
                 if name:
                     print(f"  ✓ 识别结果: 【{name}】")
                 else:
@@ -1062,7 +1229,13 @@ class AutoFollower:
             print(f"✗ 验证失败: {e}")
             return False
     
-    def run(self, interval_min: float = 2.0, interval_max: float = 5.0, max_users: Optional[int] = None) -> None:
+    def run(
+        self,
+        interval_min: float = 2.0,
+        interval_max: float = 5.0,
+        max_users: Optional[int] = None,
+        retry_failed: bool = False,
+    ) -> None:
         """
         运行自动关注流程
         
@@ -1070,16 +1243,20 @@ class AutoFollower:
             interval_min: 用户间最小间隔（秒）
             interval_max: 用户间最大间隔（秒）
             max_users: 最多处理的用户数，不传则不限制
+            retry_failed: 是否重试已处理但未关注成功的用户（handled=true, followed=false）
         """
         # 加载用户列表
         all_users = self.load_followees()
         if not all_users:
             return
         
-        # 过滤未处理的用户（handled=false）
-        users = [u for u in all_users if not u.get("handled", False)]
+        # 已关注的用户无需任何 UI 操作，直接跳过；默认只处理 handled=false 的用户
+        if retry_failed:
+            users = [u for u in all_users if not u.get("followed", False)]
+        else:
+            users = [u for u in all_users if not u.get("handled", False) and not u.get("followed", False)]
         handled_count = len(all_users) - len(users)
-        print(f"已跳过 {handled_count} 个已处理用户")
+        print(f"已跳过 {handled_count} 个已处理/已关注用户")
         
         if max_users is not None and max_users > 0:
             users = users[:max_users]
@@ -1177,9 +1354,15 @@ def main():
         metavar="N",
         help="最多处理的用户数，不传则不限制"
     )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="重试已处理但未关注成功的用户（handled=true, followed=false）"
+    )
     
     args = parser.parse_args()
     
+    log_screen_scale()
     follower = AutoFollower(confidence=args.confidence, wechat_account=args.wechat_account)
     
     # 仅验证模式
@@ -1187,11 +1370,12 @@ def main():
         follower.run_verify_only()
         return
     
-    # 正常运行模式（只处理 handled=false 的用户）
+    # 正常运行模式（只处理未关注的用户，默认还要求 handled=false）
     follower.run(
         interval_min=args.interval_min,
         interval_max=args.interval_max,
-        max_users=args.max_users
+        max_users=args.max_users,
+        retry_failed=args.retry_failed
     )
 
 
@@ -2,14 +2,15 @@
 校准配置管理模块 - 保存和加载校准数据
 """
 
-import json
 import os
-import platform
-from dataclasses import dataclass, asdict, field
-from typing import Optional
+from dataclasses import dataclass, asdict, field, fields
+from typing import Optional, Tuple
 
+from ..config import _DATACLASS_OPTIONS, _IS_WINDOWS
+from .utils import _dumps, _loads
 
-@dataclass
+
+@dataclass(**_DATACLASS_OPTIONS)
 class NavigatorCalibration:
     """导航器校准数据"""
     account_list_x: int = 400
@@ -19,7 +20,7 @@ class NavigatorCalibration:
     article_area_y: int = 300
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class OCRCalibration:
     """OCR 校准数据"""
     account_name_x: int = 340
@@ -36,7 +37,7 @@ class OCRCalibration:
     searched_gongzhonghao_height: int = 100
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class CalibrationData:
     """完整的校准数据"""
     navigator: NavigatorCalibration = field(default_factory=NavigatorCalibration)
@@ -44,12 +45,72 @@ class CalibrationData:
     calibrated: bool = False  # 是否已校准
 
 
+# 各校准段的字段名（模块加载时计算一次）
+_NAV_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(NavigatorCalibration))
+_OCR_FIELDS: Tuple[str, ...] = tuple(f.name for f in fields(OCRCalibration))
+
+
+def _fill_fields(obj, field_names: Tuple[str, ...], values: dict):
+    """
+    按字段名把 values 中的值赋给 obj（缺失的字段保留默认值，未知键忽略）
+    
+    Args:
+        obj: 以默认值构造的校准数据对象
+        field_names: 允许赋值的字段名
+        values: 配置文件中的原始字典
+        
+    Returns:
+        赋值后的 obj
+    """
+    for name in field_names:
+        if name in values:
+            setattr(obj, name, values[name])
+    return obj
+
+
 class CalibrationManager:
     """校准配置管理器"""
     
     DEFAULT_FILE = "calibration.json"
     WIN_FILE = "calibration-win.json"
     
+    USAGE_COMMENT = "可手动编辑此文件，然后用 -v 参数验证: uv run python -m wechat_gzh.auto_comment -v"
+    
+    # 保存格式模板：(段名, ((键, 注释), ...))，注释为 None 的键填入对应字段值
+    SAVE_LAYOUT = (
+        ("navigator", (
+            ("_说明", "导航器配置 - 控制点击公众号和文章的位置（逻辑坐标）"),
+            ("account_list_x", None),
+            ("_account_list_x", "公众号列表项的 X 屏幕坐标"),
+            ("account_list_y_start", None),
+            ("_account_list_y_start", "第一个公众号的 Y 屏幕坐标"),
+            ("account_item_height", None),
+            ("_account_item_height", "每个公众号项的高度（用于计算第N个公众号的位置）"),
+            ("article_area_x", None),
+            ("_article_area_x", "文章/消息区域的 X 屏幕坐标"),
+            ("article_area_y", None),
+            ("_article_area_y", "第一篇文章的 Y 屏幕坐标"),
+        )),
+        ("ocr", (
+            ("_说明", "OCR 识别区域配置 - 控制文字识别的截图区域（逻辑坐标）"),
+            ("account_name_x", None),
+            ("account_name_y", None),
+            ("account_name_width", None),
+            ("account_name_height", None),
+            ("_account_name", "公众号名称区域：(x, y) 是屏幕左上角坐标，width/height 是宽高"),
+            ("article_title_x", None),
+            ("article_title_y", None),
+            ("article_title_width", None),
+            ("article_title_height", None),
+            ("_article_title", "文章标题区域：(x, y) 是屏幕左上角坐标，width/height 是宽高"),
+            ("searched_gongzhonghao_x", None),
+            ("searched_gongzhonghao_y", None),
+            ("searched_gongzhonghao_width", None),
+            ("searched_gongzhonghao_height", None),
+            ("_searched_gongzhonghao", "搜一搜下面的第一张公众号卡片的位置：(x, y) 是屏幕左上角坐标，width/height 是宽高"),
+        )),
+    )
+    
     def __init__(self, config_dir: str):
         """
         初始化校准管理器
@@ -59,42 +120,54 @@ class CalibrationManager:
         """
         self.config_dir = config_dir
         
-        filename = self.WIN_FILE if platform.system() == "Windows" else self.DEFAULT_FILE
+        filename = self.WIN_FILE if _IS_WINDOWS else self.DEFAULT_FILE
         self.config_file = os.path.join(config_dir, filename)
+        self._file_comment = (
+            f"校准配置文件 ({'Windows' if _IS_WINDOWS else 'Mac/Linux'}) - "
+            "所有坐标为逻辑坐标（与 pyautogui.position() 一致，Retina 下非物理像素）"
+        )
         
         self._data: Optional[CalibrationData] = None
+        # 已加载数据对应的文件修改时间，文件未变化时直接复用内存中的数据
+        self._mtime_ns: Optional[int] = None
     
     @property
     def data(self) -> CalibrationData:
-        """获取校准数据（懒加载）"""
-        if self._data is None:
+        """获取校准数据（懒加载，文件被外部修改后自动重新加载）"""
+        if self._data is None or self._file_mtime_ns() != self._mtime_ns:
             self._data = self.load()
         return self._data
     
+    def _file_mtime_ns(self) -> Optional[int]:
+        """获取配置文件修改时间（纳秒），文件不存在返回 None"""
+        try:
+            return os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return None
+    
     def load(self) -> CalibrationData:
         """
         从文件加载校准数据
         
+        文件修改时间与上次加载时一致时直接返回已缓存的数据，只做一次 stat。
+        
         Returns:
             校准数据对象，如果文件不存在则返回默认值
         """
-        if not os.path.exists(self.config_file):
+        mtime_ns = self._file_mtime_ns()
+        if mtime_ns is None:
             return CalibrationData()
+        if self._data is not None and mtime_ns == self._mtime_ns:
+            return self._data
+        self._mtime_ns = mtime_ns
         
         try:
-            with open(self.config_file, "r", encoding="utf-8") as f:
-                raw_data = json.load(f)
-            
-            # 过滤掉注释字段（以 _ 开头的键）
-            def filter_comments(d: dict) -> dict:
-                return {k: v for k, v in d.items() if not k.startswith("_")}
-            
-            # 解析嵌套结构（忽略注释字段）
-            nav_data = filter_comments(raw_data.get("navigator", {}))
-            ocr_data = filter_comments(raw_data.get("ocr", {}))
+            with open(self.config_file, "rb") as f:
+                raw_data = _loads(f.read())
             
-            navigator = NavigatorCalibration(**nav_data)
-            ocr = OCRCalibration(**ocr_data)
+            # 解析嵌套结构：只读取已知字段，注释字段（以 _ 开头的键）自然被忽略
+            navigator = _fill_fields(NavigatorCalibration(), _NAV_FIELDS, raw_data.get("navigator", {}))
+            ocr = _fill_fields(OCRCalibration(), _OCR_FIELDS, raw_data.get("ocr", {}))
             calibrated = raw_data.get("calibrated", False)
             
             return CalibrationData(
@@ -102,7 +175,7 @@ class CalibrationManager:
                 ocr=ocr,
                 calibrated=calibrated
             )
-        except (json.JSONDecodeError, TypeError, KeyError) as e:
+        except (ValueError, TypeError, KeyError) as e:
             print(f"⚠ 加载校准配置失败: {e}，将使用默认值")
             return CalibrationData()
     
@@ -122,52 +195,27 @@ class CalibrationManager:
         # 确保目录存在
         os.makedirs(self.config_dir, exist_ok=True)
         
-        # 转换为字典（带注释）
-        is_win = platform.system() == "Windows"
-        filename = self.WIN_FILE if is_win else self.DEFAULT_FILE
-        
+        # 按静态模板填入字段值（注释字符串不随每次保存重新构造）
         save_data = {
-            "_说明": f"校准配置文件 ({'Windows' if is_win else 'Mac/Linux'}) - 所有坐标为逻辑坐标（与 pyautogui.position() 一致，Retina 下非物理像素）",
-            "_用法": f"可手动编辑此文件，然后用 -v 参数验证: uv run python -m wechat_gzh.auto_comment -v",
-            
-            "navigator": {
-                "_说明": "导航器配置 - 控制点击公众号和文章的位置（逻辑坐标）",
-                "account_list_x": self._data.navigator.account_list_x,
-                "_account_list_x": "公众号列表项的 X 屏幕坐标",
-                "account_list_y_start": self._data.navigator.account_list_y_start,
-                "_account_list_y_start": "第一个公众号的 Y 屏幕坐标",
-                "account_item_height": self._data.navigator.account_item_height,
-                "_account_item_height": "每个公众号项的高度（用于计算第N个公众号的位置）",
-                "article_area_x": self._data.navigator.article_area_x,
-                "_article_area_x": "文章/消息区域的 X 屏幕坐标",
-                "article_area_y": self._data.navigator.article_area_y,
-                "_article_area_y": "第一篇文章的 Y 屏幕坐标",
-            },
-            
-            "ocr": {
-                "_说明": "OCR 识别区域配置 - 控制文字识别的截图区域（逻辑坐标）",
-                "account_name_x": self._data.ocr.account_name_x,
-                "account_name_y": self._data.ocr.account_name_y,
-                "account_name_width": self._data.ocr.account_name_width,
-                "account_name_height": self._data.ocr.account_name_height,
-                "_account_name": "公众号名称区域：(x, y) 是屏幕左上角坐标，width/height 是宽高",
-                "article_title_x": self._data.ocr.article_title_x,
-                "article_title_y": self._data.ocr.article_title_y,
-                "article_title_width": self._data.ocr.article_title_width,
-                "article_title_height": self._data.ocr.article_title_height,
-                "_article_title": "文章标题区域：(x, y) 是屏幕左上角坐标，width/height 是宽高",
-                "searched_gongzhonghao_x": self._data.ocr.searched_gongzhonghao_x,
-                "searched_gongzhonghao_y": self._data.ocr.searched_gongzhonghao_y,
-                "searched_gongzhonghao_width": self._data.ocr.searched_gongzhonghao_width,
-                "searched_gongzhonghao_height": self._data.ocr.searched_gongzhonghao_height,
-                "_searched_gongzhonghao": "搜一搜下面的第一张公众号卡片的位置：(x, y) 是屏幕左上角坐标，width/height 是宽高",
-            },
-            
-            "calibrated": self._data.calibrated,
+            "_说明": self._file_comment,
+            "_用法": self.USAGE_COMMENT,
         }
+        for section, layout in self.SAVE_LAYOUT:
+            values = getattr(self._data, section)
+            save_data[section] = {
+                key: getattr(values, key) if comment is None else comment
+                for key, comment in layout
+            }
+        save_data["calibrated"] = self._data.calibrated
         
-        with open(self.config_file, "w", encoding="utf-8") as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
+        # 先整体序列化再一次性写入，避免 json.dump + indent 产生大量小块 write
+        payload = _dumps(save_data)
+        # 先写临时文件再原子替换，写入中途被中断也不会留下损坏的配置文件
+        tmp_file = self.config_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_file, self.config_file)
+        self._mtime_ns = self._file_mtime_ns()
         
         print(f"✓ 校准配置已保存到: {self.config_file}")
     
@@ -180,4 +228,5 @@ class CalibrationManager:
         if os.path.exists(self.config_file):
             os.remove(self.config_file)
             self._data = None
+            self._mtime_ns = None
             print("✓ 已清除校准配置")
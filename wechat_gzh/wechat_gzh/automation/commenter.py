@@ -2,17 +2,29 @@
 留言操作模块 - 使用图像识别定位按钮
 """
 
+import atexit
 import os
+import platform
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 
+import numpy as np
 import pyautogui
-import pyperclip
 
-from .navigator import Navigator, SCREEN_SCALE
-from .utils import random_sleep, interrupt_handler
+# OpenCV 可选：可用时模板图片只解码一次并直接 matchTemplate，否则回退到 pyautogui.locateOnScreen
+try:
+    import cv2
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+    cv2 = None  # type: ignore
+
+from .navigator import Navigator, fast_screenshot, screen_scale
+from .utils import copy_to_clipboard, interrupt_handler, random_sleep, type_unicode
 
 if TYPE_CHECKING:
     pass
@@ -22,6 +34,21 @@ MODULE_DIR = Path(__file__).parent
 PROJECT_DIR = MODULE_DIR.parent.parent
 ASSETS_DIR = PROJECT_DIR / "assets"
 
+# 平台在进程内不会变化，导入时判断一次
+_IS_DARWIN = platform.system() == "Darwin"
+
+# 多模板并行匹配的线程池，进程内所有 Commenter 共用（首次需要时创建，退出时关闭）
+_match_pool: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass(frozen=True)
+class _ClickTarget:
+    """留言流程中的一个点击目标"""
+    images: Tuple[str, ...]  # 备选图片文件名（按优先级排列）
+    region: Optional[Tuple[float, float, float, float]]  # 搜索区域（屏幕比例），None 表示全屏
+    desc: str  # 日志中的名称
+    miss_message: str  # 未找到时的提示
+
 
 class Commenter:
     """留言操作类（支持图像识别）"""
@@ -37,6 +64,21 @@ class Commenter:
     ]
     SEND_BUTTON_IMAGE = "send_button.png"        # 发送按钮
     
+    # 各按钮优先搜索的区域（屏幕比例：left, top, width, height），None 表示全屏；区域内未找到时退回全屏
+    # 写留言按钮在文章滚动到底部后通常位于屏幕下半部分
+    COMMENT_SEARCH_REGION: Optional[Tuple[float, float, float, float]] = (0.0, 0.4, 1.0, 0.6)
+    INPUT_SEARCH_REGION: Optional[Tuple[float, float, float, float]] = None
+    SEND_SEARCH_REGION: Optional[Tuple[float, float, float, float]] = None
+    
+    # 灰度匹配：单通道 matchTemplate，比 RGB 快约 3 倍，按钮图标在灰度下区分度足够
+    GRAYSCALE_MATCH = True
+    
+    # 按上次命中位置查找时，模板四周额外扩展的像素（物理像素）
+    HIT_SEARCH_MARGIN = 50
+    
+    # 资源扫描结果缓存：资源目录 -> 可用图片、已解码模板、是否启用图像识别
+    _assets_cache: Dict[Path, dict] = {}
+    
     def __init__(self, navigator: Navigator, confidence: float = 0.8):
         """
         初始化留言器
@@ -47,37 +89,82 @@ class Commenter:
         """
         self.navigator = navigator
         self.confidence = confidence
+        # 鼠标到位后、点击前的停顿（等待按钮悬停动画），moveTo 本身已按 duration 阻塞
+        self.click_dwell = 0.05
+        # 独立的随机数生成器，点击偏移不走模块级 random 的全局状态
+        self._rng = random.Random()
+        # 物理像素 -> 逻辑坐标的换算系数，预先求倒数，定位时用乘法
+        self._inv_scale = 1.0 / screen_scale()
+        # 每张图片上次命中的中心位置（逻辑坐标），下次先在附近小区域查找
+        self._last_hits: Dict[str, Tuple[int, int]] = {}
         
         # 获取平台对应的资源目录
-        import platform
-        self.platform = "mac" if platform.system() == "Darwin" else "win"
+        self.platform = "mac" if _IS_DARWIN else "win"
         self.asset_dir = ASSETS_DIR / self.platform
         
         # 是否使用图像识别
         self._use_image_recognition = True
         self._check_assets()
+        
+        # 三个点击目标共用 _click_target，差异只在图片、区域和提示文字
+        self._comment_target = _ClickTarget(
+            tuple(self._comment_button_images), self.COMMENT_SEARCH_REGION,
+            "写留言按钮", "所有图片都未找到",
+        )
+        self._input_target = _ClickTarget(
+            tuple(self._comment_input_images), self.INPUT_SEARCH_REGION,
+            "留言输入框", "所有图片都未找到",
+        )
+        self._send_target = _ClickTarget(
+            (self.SEND_BUTTON_IMAGE,), self.SEND_SEARCH_REGION,
+            "发送按钮", "图像识别失败",
+        )
     
     def _check_assets(self) -> None:
-        """检查图片资源是否存在"""
-        # 检查写留言按钮（至少需要一个）
-        comment_btn_exists = any(
-            (self.asset_dir / img).exists() for img in self.COMMENT_BUTTON_IMAGES
-        )
+        """
+        检查图片资源是否存在，并记录可用的图片（点击时不再逐个 stat）
         
-        # 检查其他必需图片
-        input_exists = any(
-            (self.asset_dir / img).exists() for img in self.COMMENT_INPUT_IMAGES
-        )
+        扫描结果按资源目录缓存在类上，同一进程内的多个 Commenter 共用；
+        设置环境变量 CALIBRATION_FORCE_FIXED=1 时跳过扫描并关闭图像识别。
+        """
+        if os.environ.get("CALIBRATION_FORCE_FIXED", "").lower() in ("1", "true", "yes"):
+            self._comment_button_images = []
+            self._comment_input_images = []
+            self._templates = {}
+            self._use_image_recognition = False
+            print(f"    ⚠ CALIBRATION_FORCE_FIXED 已设置，跳过图像识别")
+            return
+        
+        cached = Commenter._assets_cache.get(self.asset_dir)
+        if cached is not None:
+            self._comment_button_images = cached["comment_buttons"]
+            self._comment_input_images = cached["comment_inputs"]
+            self._templates = cached["templates"]
+            self._use_image_recognition = cached["use_ir"]
+            return
+        
+        self._comment_button_images = [
+            img for img in self.COMMENT_BUTTON_IMAGES if (self.asset_dir / img).exists()
+        ]
+        self._comment_input_images = [
+            img for img in self.COMMENT_INPUT_IMAGES if (self.asset_dir / img).exists()
+        ]
         send_exists = (self.asset_dir / self.SEND_BUTTON_IMAGE).exists()
         
         missing = []
-        if not comment_btn_exists:
+        if not self._comment_button_images:
             missing.append("comment_button*.png")
-        if not input_exists:
+        if not self._comment_input_images:
             missing.append("comment_input*.png")
         if not send_exists:
             missing.append(self.SEND_BUTTON_IMAGE)
         
+        self._templates = self._load_templates(
+            self._comment_button_images
+            + self._comment_input_images
+            + ([self.SEND_BUTTON_IMAGE] if send_exists else [])
+        )
+        
         if missing:
             print(f"    ⚠ 缺少图片资源: {missing}")
             print(f"    请将图片放到: {self.asset_dir}")
@@ -85,38 +172,222 @@ class Commenter:
             self._use_image_recognition = False
         else:
             # 显示找到的写留言按钮图片
-            found_btns = [img for img in self.COMMENT_BUTTON_IMAGES if (self.asset_dir / img).exists()]
             print(f"    ✓ 图片资源已就绪: {self.asset_dir}")
-            print(f"    ✓ 写留言按钮图片: {found_btns}")
+            print(f"    ✓ 写留言按钮图片: {self._comment_button_images}")
+        
+        Commenter._assets_cache[self.asset_dir] = {
+            "comment_buttons": self._comment_button_images,
+            "comment_inputs": self._comment_input_images,
+            "templates": self._templates,
+            "use_ir": self._use_image_recognition,
+        }
 
+    def _load_templates(self, image_names: list) -> Dict[str, np.ndarray]:
+        """
+        预先解码模板图片（灰度匹配时直接读为单通道），重试时不再重复读取 PNG
+        
+        Args:
+            image_names: 已确认存在的图片文件名
+            
+        Returns:
+            图片文件名 -> 模板数组，OpenCV 不可用时为空字典
+        """
+        if not HAS_CV2:
+            return {}
+        flag = cv2.IMREAD_GRAYSCALE if self.GRAYSCALE_MATCH else cv2.IMREAD_COLOR
+        templates = {}
+        for name in image_names:
+            template = cv2.imread(str(self.asset_dir / name), flag)
+            if template is not None:
+                templates[name] = template
+        return templates
+    
+    def _grab_screen(self, region: Optional[Tuple[int, int, int, int]] = None) -> np.ndarray:
+        """
+        截图并转换为与模板一致的颜色空间（灰度或 BGR）
+        
+        Args:
+            region: 截图区域 (x, y, width, height)，物理像素坐标，None 表示全屏
+            
+        Returns:
+            截图数组
+        """
+        screen = np.asarray(fast_screenshot(region=region))
+        code = cv2.COLOR_RGB2GRAY if self.GRAYSCALE_MATCH else cv2.COLOR_RGB2BGR
+        return cv2.cvtColor(screen, code)
+    
+    def _match_template(
+        self,
+        screen: np.ndarray,
+        template: np.ndarray,
+        region: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[Tuple[int, int]]:
+        """
+        在已截取的屏幕数组中查找模板，返回中心坐标（逻辑坐标）
+        
+        Args:
+            screen: _grab_screen 返回的截图数组
+            template: 模板数组（灰度或 BGR，与 GRAYSCALE_MATCH 一致）
+            region: 截图时使用的区域，用于换算回屏幕坐标
+            
+        Returns:
+            (x, y) 中心坐标，未找到返回 None
+        """
+        t_h, t_w = template.shape[:2]
+        if screen.shape[0] < t_h or screen.shape[1] < t_w:
+            return None
+        
+        result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < self.confidence:
+            return None
+        
+        offset_x, offset_y = (region[0], region[1]) if region else (0, 0)
+        # 物理像素 -> 逻辑坐标
+        x = int((offset_x + max_loc[0] + t_w / 2) * self._inv_scale)
+        y = int((offset_y + max_loc[1] + t_h / 2) * self._inv_scale)
+        return (x, y)
+    
+    def _locate_any(
+        self,
+        image_names: Sequence[str],
+        region: Optional[Tuple[int, int, int, int]] = None
+    ) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """
+        按顺序查找多张备选图片，返回第一张匹配成功的图片及其中心坐标
+        
+        已解码的模板共用一次截图并行匹配，未解码的（OpenCV 不可用）逐张走 _locate。
+        
+        Args:
+            image_names: 备选图片文件名（按优先级排列）
+            region: 搜索区域 (x, y, width, height)，截图（物理像素）坐标
+            
+        Returns:
+            (图片文件名, (x, y))，都未找到返回 None
+        """
+        matched = {}
+        templated = [name for name in image_names if name in self._templates]
+        if templated:
+            try:
+                screen = self._grab_screen(region)
+                if len(templated) == 1:
+                    name = templated[0]
+                    matched[name] = self._match_template(screen, self._templates[name], region)
+                else:
+                    # matchTemplate 在 OpenCV 内部释放 GIL，多张模板可并行匹配同一张截图
+                    futures = {
+                        name: self._get_match_pool().submit(
+                            self._match_template, screen, self._templates[name], region
+                        )
+                        for name in templated
+                    }
+                    matched = {name: future.result() for name, future in futures.items()}
+            except Exception as e:
+                print(f"    图像识别出错: {e}")
+        
+        for name in image_names:
+            pos = matched.get(name) if name in self._templates else self._locate(name, region)
+            if pos:
+                return name, pos
+        return None
+    
+    def _get_match_pool(self) -> ThreadPoolExecutor:
+        """获取（按需创建）模板匹配线程池，各 Commenter 实例共用，只注册一次退出时关闭"""
+        global _match_pool
+        if _match_pool is None:
+            _match_pool = ThreadPoolExecutor(
+                max_workers=max(len(self.COMMENT_BUTTON_IMAGES), len(self.COMMENT_INPUT_IMAGES)),
+                thread_name_prefix="template-match",
+            )
+            atexit.register(_match_pool.shutdown, wait=False)
+        return _match_pool
+    
+    def _locate_near_last_hit(
+        self, image_names: Sequence[str]
+    ) -> Optional[Tuple[str, Tuple[int, int]]]:
+        """
+        在各图片上次命中位置附近的小区域内查找（按钮位置在同一会话中基本固定）
+        
+        小区域截图和匹配的开销远小于全屏搜索，未命中时由调用方再做完整搜索。
+        
+        Args:
+            image_names: 备选图片文件名（按优先级排列）
+            
+        Returns:
+            (图片文件名, (x, y))，都未找到返回 None
+        """
+        for name in image_names:
+            last = self._last_hits.get(name)
+            template = self._templates.get(name)
+            if last is None or template is None:
+                continue
+            t_h, t_w = template.shape[:2]
+            margin = self.HIT_SEARCH_MARGIN
+            scale = screen_scale()
+            left = max(0, int(last[0] * scale - t_w / 2 - margin))
+            top = max(0, int(last[1] * scale - t_h / 2 - margin))
+            region = (left, top, t_w + 2 * margin, t_h + 2 * margin)
+            try:
+                pos = self._match_template(self._grab_screen(region), template, region)
+            except Exception as e:
+                print(f"    图像识别出错: {e}")
+                pos = None
+            if pos:
+                return name, pos
+        return None
+    
+    def _search_region(
+        self, fractions: Optional[Tuple[float, float, float, float]]
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        将屏幕比例区域换算为截图（物理像素）坐标下的搜索区域
+        
+        Args:
+            fractions: (left, top, width, height) 屏幕比例，None 表示全屏
+            
+        Returns:
+            (x, y, width, height) 物理像素区域，全屏返回 None
+        """
+        if fractions is None:
+            return None
+        screen_w, screen_h = pyautogui.size()
+        scale = screen_scale()
+        phys_w, phys_h = screen_w * scale, screen_h * scale
+        left, top, width, height = fractions
+        return (int(phys_w * left), int(phys_h * top), int(phys_w * width), int(phys_h * height))
+    
     def _locate(self, image_name: str, region: Optional[Tuple[int, int, int, int]] = None) -> Optional[Tuple[int, int]]:
         """
         在屏幕上查找图片，返回中心坐标
         
         Args:
             image_name: 图片文件名
-            region: 搜索区域 (x, y, width, height)
+            region: 搜索区域 (x, y, width, height)，截图（物理像素）坐标
             
         Returns:
             (x, y) 中心坐标，未找到返回 None
+        
+        Note:
+            图片是否存在已在 _check_assets 中确认，这里不再重复检查
         """
         img_path = self.asset_dir / image_name
-        if not img_path.exists():
-            print(f"    ⚠ 图片不存在: {img_path}")
-            return None
         
         try:
+            template = self._templates.get(image_name)
+            if template is not None:
+                return self._match_template(self._grab_screen(region), template, region)
+            
             box = pyautogui.locateOnScreen(
                 str(img_path), 
                 confidence=self.confidence,
                 region=region,
-                grayscale=False
+                grayscale=self.GRAYSCALE_MATCH
             )
             if box:
                 # box is (left, top, width, height) in physical pixels
                 # convert to logical coordinates
-                x = int((box.left + box.width / 2) / SCREEN_SCALE)
-                y = int((box.top + box.height / 2) / SCREEN_SCALE)
+                x = int((box.left + box.width / 2) * self._inv_scale)
+                y = int((box.top + box.height / 2) * self._inv_scale)
                 return (x, y)
         except pyautogui.ImageNotFoundException:
             pass
@@ -125,29 +396,43 @@ class Commenter:
         
         return None
     
-    def _find_and_click(self, image_name: str, desc: str, retry: int = 3, wait: float = 1.0) -> bool:
+    def _find_and_click(
+        self,
+        image_names: Sequence[str],
+        desc: str,
+        retry: int = 3,
+        wait: float = 1.0,
+        region: Optional[Tuple[int, int, int, int]] = None
+    ) -> bool:
         """
-        查找并点击图片
+        查找并点击图片（多张备选图片每次重试共用一次截图）
         
         Args:
-            image_name: 图片文件名
+            image_names: 备选图片文件名（按优先级排列）
             desc: 描述（用于日志）
             retry: 重试次数
             wait: 每次重试间隔
+            region: 优先搜索的区域（物理像素），区域内未找到时再搜索全屏；None 表示全屏
             
         Returns:
             是否成功点击
         """
         for i in range(retry):
-            pos = self._locate(image_name)
-            if pos:
-                print(f"    ✓ 找到 {desc} 位置: {pos}")
+            found = self._locate_near_last_hit(image_names) or self._locate_any(image_names, region)
+            if not found and region is not None:
+                # 区域内未找到（短文章、页面布局不同等）时退回全屏查找
+                found = self._locate_any(image_names)
+            if found:
+                image_name, pos = found
+                self._last_hits[image_name] = pos
+                print(f"    ✓ 找到 {desc}({image_name}) 位置: {pos}")
                 # 添加随机偏移，模拟真人
-                offset_x = random.randint(-3, 3)
-                offset_y = random.randint(-3, 3)
+                offset_x = self._rng.randint(-3, 3)
+                offset_y = self._rng.randint(-3, 3)
                 pyautogui.moveTo(pos[0] + offset_x, pos[1] + offset_y, duration=0.3)
-                time.sleep(0.2)
-                pyautogui.click(pos[0] + offset_x, pos[1] + offset_y)
+                if self.click_dwell > 0:
+                    time.sleep(self.click_dwell)
+                pyautogui.click()
                 return True
             if i < retry - 1:
                 print(f"    未找到 {desc}，重试 ({i + 1}/{retry})...")
@@ -172,23 +457,33 @@ class Commenter:
         time.sleep(0.5)
         return article_content
     
-    def click_comment_button(self) -> bool:
+    def _click_target(self, target: _ClickTarget) -> bool:
         """
-        点击写留言按钮（尝试多个图片）
+        按目标描述查找并点击按钮
         
+        Args:
+            target: 点击目标（备选图片、搜索区域、日志描述）
+            
         Returns:
             是否成功
         """
         if self._use_image_recognition:
-            # 尝试所有写留言按钮图片
-            for img in self.COMMENT_BUTTON_IMAGES:
-                if (self.asset_dir / img).exists():
-                    if self._find_and_click(img, f"写留言按钮({img})"):
-                        return True
-            print(f"    → 所有图片都未找到")
+            region = self._search_region(target.region)
+            if self._find_and_click(target.images, target.desc, region=region):
+                return True
+            print(f"    → {target.miss_message}")
         
         return False
     
+    def click_comment_button(self) -> bool:
+        """
+        点击写留言按钮（尝试多个图片）
+        
+        Returns:
+            是否成功
+        """
+        return self._click_target(self._comment_target)
+    
     def click_input_box(self) -> bool:
         """
         点击留言输入框
@@ -196,15 +491,7 @@ class Commenter:
         Returns:
             是否成功
         """
-        if self._use_image_recognition:
-            # 尝试所有留言输入框图片
-            for img in self.COMMENT_INPUT_IMAGES:
-                if (self.asset_dir / img).exists():
-                    if self._find_and_click(img, f"留言输入框({img})"):
-                        return True
-            print(f"    → 所有图片都未找到")
-        
-        return False
+        return self._click_target(self._input_target)
     
     def input_comment(self, text: str) -> None:
         """
@@ -217,10 +504,11 @@ class Commenter:
         self.click_input_box()
         time.sleep(0.3)
         
-        # 使用剪贴板输入中文
-        pyperclip.copy(text)
-        modifier = "command" if self.platform == "mac" else "ctrl"
-        pyautogui.hotkey(modifier, "v")
+        # Windows 直接注入 Unicode 字符；其他平台使用剪贴板粘贴中文
+        if not type_unicode(text):
+            copy_to_clipboard(text)
+            modifier = "command" if self.platform == "mac" else "ctrl"
+            pyautogui.hotkey(modifier, "v")
         time.sleep(0.3)
     
     def click_send(self) -> bool:
@@ -230,12 +518,7 @@ class Commenter:
         Returns:
             是否成功
         """
-        if self._use_image_recognition:
-            if self._find_and_click(self.SEND_BUTTON_IMAGE, "发送按钮"):
-                return True
-            print(f"    → 图像识别失败")
-        
-        return False
+        return self._click_target(self._send_target)
     
     def leave_comment(
         self, 
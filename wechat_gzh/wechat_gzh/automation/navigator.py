@@ -4,11 +4,14 @@
 
 import time
 import platform
-from typing import Tuple, Optional, TYPE_CHECKING
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple, Optional, TYPE_CHECKING
 
 import pyautogui
+from PIL import Image, ImageChops
 
-from .utils import random_sleep, calculate_similarity
+from .ocr_singleton import downscale_for_ocr, get_ocr
+from .utils import random_sleep, calculate_similarity, dhash, hamming_distance
 
 if TYPE_CHECKING:
     from .calibration import NavigatorCalibration
@@ -21,7 +24,17 @@ def get_screen_scale() -> float:
     Returns:
         缩放比例，普通屏幕为 1.0，Retina 为 2.0
     """
-    # 尝试通过截图和 pyautogui 尺寸比较来检测
+    # macOS 直接读取主屏 backingScaleFactor，无需截图
+    if platform.system() == "Darwin":
+        try:
+            from AppKit import NSScreen
+            scale = float(NSScreen.mainScreen().backingScaleFactor())
+            if scale > 0:
+                return scale
+        except Exception:
+            pass
+    
+    # 回退：通过截图和 pyautogui 尺寸比较来检测
     try:
         screenshot = pyautogui.screenshot()
         screen_size = pyautogui.size()
@@ -38,9 +51,138 @@ def get_screen_scale() -> float:
     return 1.0
 
 
-# 全局缩放比例（启动时检测一次）
-SCREEN_SCALE = get_screen_scale()
-print(f"📺 屏幕缩放比例: {SCREEN_SCALE}x")
+# 全局缩放比例（首次使用时检测一次，导入模块时不截图）
+_SCREEN_SCALE: Optional[float] = None
+
+
+def screen_scale() -> float:
+    """
+    获取屏幕缩放比例（首次调用时检测并缓存）
+    
+    Returns:
+        缩放比例，普通屏幕为 1.0，Retina 为 2.0
+    """
+    global _SCREEN_SCALE
+    if _SCREEN_SCALE is None:
+        _SCREEN_SCALE = get_screen_scale()
+    return _SCREEN_SCALE
+
+
+def log_screen_scale() -> None:
+    """打印屏幕缩放比例（由程序入口调用一次，模块本身不在导入或检测时输出）"""
+    print(f"📺 屏幕缩放比例: {screen_scale()}x")
+
+
+# macOS 下用 Quartz 直接抓取主屏像素，比 pyautogui（经 screencapture 写 PNG 再读回）快得多
+try:
+    import Quartz
+    _HAS_QUARTZ = platform.system() == "Darwin"
+except ImportError:
+    _HAS_QUARTZ = False
+
+
+def fast_screenshot(region: Optional[Tuple[int, int, int, int]] = None) -> Image.Image:
+    """
+    截取屏幕（与 pyautogui.screenshot 相同的坐标约定和返回格式）
+    
+    macOS 且安装了 pyobjc 时通过 CGDisplayCreateImageForRect 直接取原始 BGRA 像素，
+    失败或其他平台回退到 pyautogui.screenshot。
+    
+    Args:
+        region: 截图区域 (x, y, width, height)，截图（物理像素）坐标，None 表示全屏
+        
+    Returns:
+        RGB 模式的 PIL Image
+    """
+    if _HAS_QUARTZ:
+        try:
+            display = Quartz.CGMainDisplayID()
+            if region is None:
+                cg_image = Quartz.CGDisplayCreateImage(display)
+            else:
+                # Quartz 的矩形使用点（逻辑坐标），输出图像为物理像素
+                scale = screen_scale()
+                x, y, w, h = region
+                rect = Quartz.CGRectMake(x / scale, y / scale, w / scale, h / scale)
+                cg_image = Quartz.CGDisplayCreateImageForRect(display, rect)
+            width = Quartz.CGImageGetWidth(cg_image)
+            height = Quartz.CGImageGetHeight(cg_image)
+            bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
+            data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_image))
+            image = Image.frombuffer(
+                "RGBA", (width, height), bytes(data), "raw", "BGRA", bytes_per_row, 1
+            )
+            return image.convert("RGB")
+        except Exception:
+            pass
+    return pyautogui.screenshot(region=region)
+
+
+# 滚动到顶/底检测用的缩略图边长
+COMPARE_THUMB_SIZE = 128
+
+# 滚动后等待页面渲染的最短时间；已出现相同帧（接近顶/底）时等待减半，但不低于此值
+MIN_SCROLL_WAIT = 0.1
+
+# 鼠标移到目标后、点击前的短暂停顿（让微信响应悬停）
+CLICK_SETTLE = 0.05
+
+# 滚动若干次之后才开始截图对比（刚开始滚动时不可能已到顶/底）
+TOP_COMPARE_AFTER = 2
+BOTTOM_COMPARE_AFTER = 3
+
+# 前后帧 dHash 相差超过此位数（共 64 位）时直接认为页面仍在变化，不再逐像素对比
+DHASH_CHANGED_DISTANCE = 16
+
+# 连续相同帧达到此次数认为已到顶/底；逐像素完全相同的帧更可靠，所需次数更少
+SAME_FRAMES_TO_STOP = 3
+IDENTICAL_FRAMES_TO_STOP = 2
+
+# 关闭当前文章窗口的快捷键（macOS 使用 command+w，Windows 使用 ctrl+w）
+_HOTKEY_CLOSE = ("command", "w") if platform.system() == "Darwin" else ("ctrl", "w")
+
+
+def _capture_compare_thumbnail(screenshot: Optional[Image.Image] = None) -> Image.Image:
+    """
+    截取屏幕中间 1/3 区域，缩成灰度缩略图用于前后帧对比
+    
+    用最近邻采样而不是平滑缩放：采样像素的平均差异与原图一致，
+    原有的相似度阈值仍然适用；平滑缩放会把文字糊成灰块，使相似度虚高。
+    返回 PIL 图片，calculate_similarity 直接用 ImageChops 比较。
+    
+    Args:
+        screenshot: 已有的全屏截图（如刚用于 OCR 的那张），None 时重新截图
+    
+    Returns:
+        (COMPARE_THUMB_SIZE, COMPARE_THUMB_SIZE) 灰度图
+    """
+    if screenshot is None:
+        screenshot = fast_screenshot()
+    w, h = screenshot.size
+    region = screenshot.crop((w // 3, h // 3, 2 * w // 3, 2 * h // 3))
+    return region.resize((COMPARE_THUMB_SIZE, COMPARE_THUMB_SIZE), Image.NEAREST).convert("L")
+
+
+def _frames_identical(a: Image.Image, b: Image.Image) -> bool:
+    """两张缩略图是否逐像素完全相同（差异图没有非零区域）"""
+    return ImageChops.difference(a, b).getbbox() is None
+
+
+def _scroll_wait(base: float, scroll_count: int, consecutive_same: int) -> float:
+    """
+    计算滚动后的等待时间
+    
+    Args:
+        base: 平台默认等待时间
+        scroll_count: 已滚动次数
+        consecutive_same: 连续相同帧次数
+        
+    Returns:
+        本次等待秒数
+    """
+    if scroll_count < 3 or consecutive_same == 0:
+        return base
+    return max(MIN_SCROLL_WAIT, base / 2)
 
 
 class Navigator:
@@ -106,8 +248,9 @@ class Navigator:
         # 配置为逻辑坐标（与 pyautogui.position() 一致），直接用于 moveTo/click
         click_x = self.account_list_x
         click_y = self.account_list_y_start + (index * self.account_item_height)
+        # moveTo 按 duration 阻塞到鼠标到位，点击前只留短暂停顿
         pyautogui.moveTo(click_x, click_y, duration=0.3)
-        time.sleep(0.2)
+        time.sleep(CLICK_SETTLE)
         pyautogui.click()
         print(f"    → 点击坐标（逻辑）: ({click_x}, {click_y})")
     
@@ -116,8 +259,9 @@ class Navigator:
         # 配置为逻辑坐标，直接用于 moveTo/click
         click_x = self.article_area_x
         click_y = self.article_area_y
+        # moveTo 按 duration 阻塞到鼠标到位，点击前只留短暂停顿
         pyautogui.moveTo(click_x, click_y, duration=0.3)
-        time.sleep(0.2)
+        time.sleep(CLICK_SETTLE)
         pyautogui.click()
         print(f"    → 点击坐标（逻辑）: ({click_x}, {click_y})")
     
@@ -211,16 +355,6 @@ class Navigator:
         Returns:
             实际滚动次数
         """
-        import numpy as np
-        
-        def capture_screen_region() -> np.ndarray:
-            """截取屏幕中间区域用于对比"""
-            screenshot = pyautogui.screenshot()
-            img_array = np.array(screenshot)
-            h, w = img_array.shape[:2]
-            return img_array[h//3:2*h//3, w//3:2*w//3]
-        
-        
         scroll_count = 0
         prev_screenshot = None
         consecutive_same = 0
@@ -237,20 +371,24 @@ class Navigator:
             # 检查中断
             interrupt_handler.check()
             
-            # 向上滚动
+            # 向上滚动；前几次保持完整等待让内容渲染，出现相同帧后缩短等待以尽快确认到顶
             self.scroll_article("up", scroll_step)
-            time.sleep(0.2)
+            time.sleep(_scroll_wait(0.2, scroll_count, consecutive_same))
             scroll_count += 1
             
+            if scroll_count < TOP_COMPARE_AFTER:
+                continue
+            
             # 截图对比检测是否到顶
-            current_screenshot = capture_screen_region()
+            current_screenshot = _capture_compare_thumbnail()
             
             if prev_screenshot is not None:
-                similarity = calculate_similarity(prev_screenshot, current_screenshot)
+                # 完全相同的帧直接计数，否则再按相似度阈值判断（容忍光标闪烁等小变化）
+                identical = _frames_identical(prev_screenshot, current_screenshot)
                 
-                if similarity >= similarity_threshold:
+                if identical or calculate_similarity(prev_screenshot, current_screenshot) >= similarity_threshold:
                     consecutive_same += 1
-                    if consecutive_same >= 3:
+                    if consecutive_same >= (IDENTICAL_FRAMES_TO_STOP if identical else SAME_FRAMES_TO_STOP):
                         print(f"    ✓ 已滚动到顶部（第 {scroll_count} 次滚动）")
                         break
                 else:
@@ -265,7 +403,8 @@ class Navigator:
         self, 
         similarity_threshold: float = 0.95,
         ocr_screens: int = 2,
-        max_scrolls: int = 200
+        max_scrolls: int = 200,
+        time_budget_s: float = 120.0
     ) -> Tuple[int, str]:
         """
         滚动到文章底部（通过截图对比检测是否到底），同时 OCR 识别前几屏内容
@@ -274,37 +413,59 @@ class Navigator:
             similarity_threshold: 相似度阈值（0-1），超过此值认为已到底部
             ocr_screens: OCR 识别前几屏的内容（默认2屏）
             max_scrolls: 最大滚动次数，防止无限循环
+            time_budget_s: 最长滚动时间（秒），超时后停止滚动
             
         Returns:
             (实际滚动次数, 识别到的文章内容)
         """
-        import numpy as np
-        
-        # 尝试导入 CnOcr
-        try:
-            from cnocr import CnOcr
-            ocr = CnOcr(det_model_name='ch_PP-OCRv3_det')
-            has_ocr = True
-        except ImportError:
-            has_ocr = False
-            ocr = None
-        
-        def capture_screen_region() -> np.ndarray:
-            """截取屏幕中间区域用于对比"""
-            screenshot = pyautogui.screenshot()
-            img_array = np.array(screenshot)
-            h, w = img_array.shape[:2]
-            return img_array[h//3:2*h//3, w//3:2*w//3]
+        # 复用共享的 CnOcr 实例（未安装时为 None）
+        ocr = get_ocr()
+        has_ocr = ocr is not None
         
         def capture_full_screen():
             """截取全屏用于 OCR"""
-            return pyautogui.screenshot()
+            return fast_screenshot()
+        
+        def run_ocr(image):
+            """识别一屏内容（在后台线程中缩小并识别）"""
+            return ocr.ocr(downscale_for_ocr(image))
         
         scroll_count = 0
         prev_screenshot = None
+        prev_hash = 0
         consecutive_same = 0
         article_content_parts = []
         
+        # OCR 在后台线程执行（CnOcr 推理时释放 GIL），与后续滚动、截图重叠
+        # 共享的 CnOcr 实例不保证线程安全，只用一个工作线程
+        ocr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="article-ocr") if has_ocr else None
+        ocr_futures: List[Future] = []  # 按截图顺序排列的识别任务
+            
+        def screens_wanted() -> bool:
+            """尚未识别完或识别出内容的屏数不足 ocr_screens 时，还需要继续截屏识别"""
+            useful = 0
+            for future in ocr_futures:
+                if not future.done():
+                    useful += 1
+                elif future.exception() is None and any(item.get('text') for item in future.result()):
+                    useful += 1
+            return useful < ocr_screens
+        
+        def collect_ocr() -> None:
+            """按截图顺序取回 OCR 结果，保留前 ocr_screens 个非空屏"""
+            for future in ocr_futures:
+                if len(article_content_parts) >= ocr_screens:
+                    future.cancel()
+                    continue
+                try:
+                    results = future.result()
+                    texts = [t for t in (item.get('text') for item in results) if t]
+                    if texts:
+                        article_content_parts.append("\n".join(texts))
+                        print(f"    📖 已识别第 {len(article_content_parts)} 屏内容 ({len(texts)} 行)")
+                except Exception as e:
+                    print(f"    ⚠ OCR 识别出错: {e}")
+        
         print(f"    📜 开始模拟阅读文章...")
         
         from .utils import interrupt_handler
@@ -313,73 +474,97 @@ class Navigator:
         screen_width, screen_height = pyautogui.size()
         pyautogui.moveTo(screen_width // 2, screen_height // 2)
         
-        # 识别第一屏内容（滚动前）
-        if has_ocr and ocr_screens > 0:
-            try:
+        try:
+            # 识别第一屏内容（滚动前截图，识别在后台进行）
+            if has_ocr and ocr_screens > 0:
                 interrupt_handler.check()  # 检查中断
-                first_screen = capture_full_screen()
-                results = ocr.ocr(first_screen)
-                texts = [item['text'] for item in results if item.get('text')]
-                if texts:
-                    article_content_parts.append("\n".join(texts))
-                    print(f"    📖 已识别第 1 屏内容 ({len(texts)} 行)")
-            except Exception as e:
-                print(f"    ⚠ OCR 识别出错: {e}")
-        
-        # 根据平台调整滚动参数
-        is_windows = platform.system() == "Windows"
-        scroll_step = 300 if is_windows else 5  # Windows 需要更大的滚动值
-        sleep_time = 0.1 if is_windows else 0.4 # Windows 滚动响应较快，减少等待
+                ocr_futures.append(ocr_executor.submit(run_ocr, capture_full_screen()))
         
-        while scroll_count < max_scrolls:
-            # 检查中断
-            interrupt_handler.check()
+            # 根据平台调整滚动参数
+            is_windows = platform.system() == "Windows"
+            scroll_step = 300 if is_windows else 5  # Windows 需要更大的滚动值
+            sleep_time = 0.1 if is_windows else 0.4 # Windows 滚动响应较快，减少等待
+        
+            start_time = time.monotonic()
+            timed_out = False
+        
+            while scroll_count < max_scrolls:
+                # 检查中断
+                interrupt_handler.check()
             
-            # 滚动
-            self.scroll_article("down", scroll_step)
-            time.sleep(sleep_time)
-            scroll_count += 1
+                if time.monotonic() - start_time > time_budget_s:
+                    timed_out = True
+                    break
             
-            # 识别更多屏内容（第 2 屏开始，每滚动几次识别一次）
-            # Windows 滚动幅度大，可以每滚动 2 次识别一次
-            check_interval = 2 if is_windows else 3
-            if has_ocr and scroll_count <= ocr_screens * check_interval and scroll_count % check_interval == 0:
-                screen_num = len(article_content_parts) + 1
-                if screen_num <= ocr_screens:
-                    try:
-                        interrupt_handler.check()  # 检查中断
-                        screen = capture_full_screen()
-                        results = ocr.ocr(screen)
-                        texts = [item['text'] for item in results if item.get('text')]
-                        if texts:
-                            article_content_parts.append("\n".join(texts))
-                            print(f"    📖 已识别第 {screen_num} 屏内容 ({len(texts)} 行)")
-                    except Exception as e:
-                        print(f"    ⚠ OCR 识别出错: {e}")
+                # 滚动；前几次保持完整等待让内容渲染，出现相同帧后缩短等待以尽快确认到底
+                self.scroll_article("down", scroll_step)
+                time.sleep(_scroll_wait(sleep_time, scroll_count, consecutive_same))
+                scroll_count += 1
             
-            # 截图对比检测是否到底
-            current_screenshot = capture_screen_region()
+                # 识别更多屏内容（第 2 屏开始，每滚动几次识别一次）
+                # Windows 滚动幅度大，可以每滚动 2 次识别一次
+                check_interval = 2 if is_windows else 3
+                need_ocr = (
+                    has_ocr
+                    and scroll_count <= ocr_screens * check_interval
+                    and scroll_count % check_interval == 0
+                    and screens_wanted()
+                )
+                if not need_ocr and scroll_count < BOTTOM_COMPARE_AFTER:
+                    continue
             
-            if prev_screenshot is not None:
-                similarity = calculate_similarity(prev_screenshot, current_screenshot)
-                
-                if similarity >= similarity_threshold:
-                    consecutive_same += 1
-                    if consecutive_same >= 3:
-                        print(f"    ✓ 已滚动到底部（第 {scroll_count} 次滚动，相似度 {similarity:.2%}）")
-                        break
-                else:
-                    consecutive_same = 0
+                # 每次滚动只截一次全屏，OCR 和到底检测共用
+                full_screen = capture_full_screen()
             
-            prev_screenshot = current_screenshot
+                if need_ocr:
+                    # 不等待前一屏结果直接提交；前面有屏识别为空时才多截一屏补上
+                    ocr_futures.append(ocr_executor.submit(run_ocr, full_screen))
             
-            # 每10次滚动打印进度
-            if scroll_count % 10 == 0:
-                print(f"    📜 已滚动 {scroll_count} 次...")
-        
-        # 检查是否达到最大滚动次数
-        if scroll_count >= max_scrolls:
-            print(f"    ⚠ 已达到最大滚动次数 {max_scrolls}，停止滚动")
+                if scroll_count < BOTTOM_COMPARE_AFTER:
+                    continue
+            
+                # 截图对比检测是否到底
+                current_screenshot = _capture_compare_thumbnail(full_screen)
+                current_hash = dhash(current_screenshot)
+            
+                if prev_screenshot is not None:
+                    if hamming_distance(prev_hash, current_hash) > DHASH_CHANGED_DISTANCE:
+                        # 指纹差异明显，页面还在滚动，跳过逐像素对比
+                        consecutive_same = 0
+                    else:
+                        # 完全相同的帧直接计数，否则再按相似度阈值判断
+                        identical = _frames_identical(prev_screenshot, current_screenshot)
+                        similarity = 1.0 if identical else calculate_similarity(prev_screenshot, current_screenshot)
+                    
+                        if similarity >= similarity_threshold:
+                            consecutive_same += 1
+                            if consecutive_same >= (IDENTICAL_FRAMES_TO_STOP if identical else SAME_FRAMES_TO_STOP):
+                                print(f"    ✓ 已滚动到底部（第 {scroll_count} 次滚动，相似度 {similarity:.2%}）")
+                                break
+                        else:
+                            consecutive_same = 0
+            
+                prev_screenshot = current_screenshot
+                prev_hash = current_hash
+            
+                # 每10次滚动打印进度
+                if scroll_count % 10 == 0:
+                    print(f"    📜 已滚动 {scroll_count} 次...")
+        
+            # 检查是否超时或达到最大滚动次数
+            if timed_out:
+                print(f"    ⚠ 滚动超过 {time_budget_s:.0f} 秒，停止滚动")
+            elif scroll_count >= max_scrolls:
+                print(f"    ⚠ 已达到最大滚动次数 {max_scrolls}，停止滚动")
+        
+            # 取回各屏的 OCR 结果
+            collect_ocr()
+        finally:
+            # 中断等异常退出时也要取消未开始的识别并释放线程
+            if ocr_executor is not None:
+                for future in ocr_futures:
+                    future.cancel()
+                ocr_executor.shutdown(wait=False)
         
         # 合并识别到的内容
         article_content = "\n\n".join(article_content_parts)
@@ -388,12 +573,15 @@ class Navigator:
         
         return scroll_count, article_content
     
-    def go_back(self) -> None:
-        """返回上一页（使用快捷键关闭当前窗口）"""
-        # macOS 使用 command+w，Windows 使用 ctrl+w
-        modifier = "command" if platform.system() == "Darwin" else "ctrl"
-        pyautogui.hotkey(modifier, "w")
-        time.sleep(0.5)
+    def go_back(self, wait: float = 0.2) -> None:
+        """
+        返回上一页（使用快捷键关闭当前窗口）
+        
+        Args:
+            wait: 关闭后等待窗口切换的时间（秒）
+        """
+        pyautogui.hotkey(*_HOTKEY_CLOSE)
+        time.sleep(wait)
     
     def click_at_position(self, x: int, y: int) -> None:
         """
@@ -2,32 +2,58 @@
 OCR 模块 - 使用 CnOcr 进行中文文字识别
 """
 
-from typing import TYPE_CHECKING, Optional, List
+import atexit
+import hashlib
+import importlib.util
+import shelve
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, List, Tuple
 
-from PIL import Image
+from PIL import Image, ImageStat
 import pyautogui
 
-try:
-    from cnocr import CnOcr
-    HAS_CNOCR = True
-except ImportError:
-    HAS_CNOCR = False
-    CnOcr = None  # type: ignore
+# 只探测 cnocr 是否已安装，不导入（导入会连带加载 torch 等重依赖）；
+# 真正的导入与初始化推迟到 get_ocr() 首次调用
+HAS_CNOCR = importlib.util.find_spec("cnocr") is not None
 
-from .navigator import SCREEN_SCALE
+from ..config import PROJECT_DIR
+from .navigator import fast_screenshot, screen_scale
+from .ocr_singleton import downscale_for_ocr, get_ocr
 
 if TYPE_CHECKING:
     from .calibration import OCRCalibration
 
 
+# 跨会话 OCR 结果缓存位置（识别结果只取决于截图内容，公众号名称等界面日复一日不变）
+# 与 LLM 评论缓存同在项目目录下的 .cache 中
+OCR_DISK_CACHE = Path(PROJECT_DIR) / ".cache" / "ocr"
+# 缓存键版本，更换 OCR 模型或后处理时递增，使旧结果失效
+OCR_DISK_CACHE_VERSION = "v2"
+# 磁盘缓存最多保留的条数，打开时超出则删除最早写入的条目
+OCR_DISK_CACHE_MAX_ENTRIES = 5000
+
+
 class OCRReader:
     """OCR 文字识别器（使用 CnOcr）"""
     
-    def __init__(self):
-        """初始化 OCR 识别器"""
+    # OCR 结果缓存条数（同一公众号标题栏、列表行反复识别时直接命中）
+    OCR_CACHE_SIZE = 256
+    
+    # 灰度标准差低于此值视为纯背景（界面未加载、区域为空），不调用模型
+    BLANK_STDDEV = 5.0
+    
+    def __init__(self, use_cache: bool = True):
+        """
+        初始化 OCR 识别器
+        
+        Args:
+            use_cache: 是否使用磁盘上的跨会话 OCR 结果缓存
+        """
         # 初始化 CnOcr（使用 PP-OCRv3 检测模型）
         if HAS_CNOCR:
-            self._ocr = CnOcr(det_model_name='ch_PP-OCRv3_det')
+            self._ocr = get_ocr()
             print("    ✓ CnOcr 初始化成功")
         else:
             self._ocr = None
@@ -47,6 +73,63 @@ class OCRReader:
         
         self._name_calibrated = False
         self._title_calibrated = False
+        
+        # OCR 结果缓存：(截图尺寸, 截图内容哈希) -> 识别文字（LRU）
+        self._ocr_cache: "OrderedDict[Tuple[Tuple[int, int], bytes], str]" = OrderedDict()
+        # 磁盘缓存（shelve），打开失败时只使用内存缓存
+        self._disk_cache = self._open_disk_cache() if use_cache else None
+    
+    def _open_disk_cache(self) -> Optional[shelve.Shelf]:
+        """
+        打开跨会话 OCR 结果缓存，超出容量时先清理，进程退出时自动关闭
+        
+        Returns:
+            shelve 对象，打开失败返回 None
+        """
+        try:
+            OCR_DISK_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            cache = shelve.open(str(OCR_DISK_CACHE))
+            self._prune_disk_cache(cache)
+        except Exception as e:
+            print(f"    ⚠ OCR 缓存不可用: {e}")
+            return None
+        atexit.register(cache.close)
+        return cache
+    
+    def close(self) -> None:
+        """
+        关闭磁盘缓存并取消退出时的自动关闭
+        
+        同一进程中多次创建识别器（如 Web 界面每次运行新建机器人）时，旧实例用完应关闭，
+        否则 shelve 句柄和退出回调会不断累积。关闭后只使用内存缓存；重复调用无副作用。
+        """
+        if self._disk_cache is None:
+            return
+        atexit.unregister(self._disk_cache.close)
+        self._disk_cache.close()
+        self._disk_cache = None
+    
+    @staticmethod
+    def _prune_disk_cache(cache: shelve.Shelf) -> None:
+        """
+        条目数超过 OCR_DISK_CACHE_MAX_ENTRIES 时删除最早写入的条目（含旧版本键）
+        
+        Args:
+            cache: 已打开的 shelve 对象，值为 (写入时间, 识别文字)
+        """
+        excess = len(cache) - OCR_DISK_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        
+        def written_at(key: str) -> float:
+            if not key.startswith(OCR_DISK_CACHE_VERSION + ":"):
+                return 0.0
+            value = cache[key]
+            return value[0] if isinstance(value, tuple) else 0.0
+        
+        for key in sorted(cache.keys(), key=written_at)[:excess]:
+            del cache[key]
+        print(f"    ✓ 已清理 {excess} 条旧的 OCR 缓存")
     
     def load_calibration(self, calibration: "OCRCalibration") -> None:
         """加载校准数据"""
@@ -93,11 +176,12 @@ class OCRReader:
         Returns:
             PIL Image 对象
         """
-        physical_x = int(x * SCREEN_SCALE)
-        physical_y = int(y * SCREEN_SCALE)
-        physical_width = int(width * SCREEN_SCALE)
-        physical_height = int(height * SCREEN_SCALE)
-        return pyautogui.screenshot(region=(physical_x, physical_y, physical_width, physical_height))
+        scale = screen_scale()
+        physical_x = int(x * scale)
+        physical_y = int(y * scale)
+        physical_width = int(width * scale)
+        physical_height = int(height * scale)
+        return fast_screenshot(region=(physical_x, physical_y, physical_width, physical_height))
     
     def recognize_text(self, image: Image.Image) -> str:
         """
@@ -114,19 +198,48 @@ class OCRReader:
             return ""
         
         try:
-            # CnOcr 直接识别 PIL Image
-            results = self._ocr.ocr(image)
+            # 截图内容完全相同时直接返回上次结果，跳过 OCR 推理
+            key = (image.size, hashlib.blake2b(image.tobytes(), digest_size=8).digest())
+            cached = self._ocr_cache.get(key)
+            if cached is not None:
+                self._ocr_cache.move_to_end(key)
+                return cached
+            
+            disk_key = f"{OCR_DISK_CACHE_VERSION}:{image.size[0]}x{image.size[1]}:{key[1].hex()}"
+            if self._disk_cache is not None:
+                entry = self._disk_cache.get(disk_key)
+                if entry is not None:
+                    cached = entry[1]
+                    self._remember(key, cached)
+                    return cached
             
-            # 提取文本
-            text_lines = [item['text'] for item in results if item.get('text')]
-            full_text = "\n".join(text_lines)
+            # 纯色区域直接返回空结果（最近邻采样保持像素分布，细笔画文字不会被平均掉）
+            sample = image.convert("L").resize((64, 64), Image.NEAREST)
+            if ImageStat.Stat(sample).stddev[0] < self.BLANK_STDDEV:
+                return ""
             
-            return full_text.strip()
+            # CnOcr 直接识别 PIL Image（过高的图片先缩小，标题/名称小区域不受影响）
+            results = self._ocr.ocr(downscale_for_ocr(image))
+            
+            # 提取文本（每项只查一次 text 键，生成器直接 join，不建中间列表）
+            full_text = "\n".join(t for t in (item.get('text') for item in results) if t).strip()
+            
+            self._remember(key, full_text)
+            if self._disk_cache is not None:
+                self._disk_cache[disk_key] = (time.time(), full_text)
+            
+            return full_text
             
         except Exception as e:
             print(f"    OCR 识别出错: {e}")
             return ""
     
+    def _remember(self, key: Tuple[Tuple[int, int], bytes], text: str) -> None:
+        """写入内存 LRU 缓存"""
+        self._ocr_cache[key] = text
+        if len(self._ocr_cache) > self.OCR_CACHE_SIZE:
+            self._ocr_cache.popitem(last=False)
+    
     def get_account_name(self, save_crop_path: Optional[str] = None) -> str:
         """
         获取公众号名称（使用屏幕绝对坐标）
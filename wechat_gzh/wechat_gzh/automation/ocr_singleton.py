@@ -0,0 +1,82 @@
+"""
+CnOcr 共享实例 - 进程内只加载一次模型
+"""
+
+import functools
+import os
+from typing import TYPE_CHECKING, Optional
+
+from PIL import Image
+
+if TYPE_CHECKING:
+    from cnocr import CnOcr
+
+# 默认检测模型（PP-OCRv3）
+DEFAULT_DET_MODEL = "ch_PP-OCRv3_det"
+
+# 送入 OCR 的最大图片高度：检测网络计算量随像素数近似平方增长，
+# 全屏截图（Retina 下 1800+ 像素高）缩到此高度后正文字号仍足够识别
+OCR_MAX_HEIGHT = 960
+
+
+def _default_context() -> str:
+    """
+    选择 CnOcr 的运行设备
+    
+    环境变量 CNOCR_CONTEXT 优先；否则 onnxruntime 提供 CUDA 时用 gpu，其余用 cpu。
+    
+    Returns:
+        CnOcr 的 context 参数
+    """
+    context = os.environ.get("CNOCR_CONTEXT")
+    if context:
+        return context
+    try:
+        import onnxruntime
+    except ImportError:
+        return "cpu"
+    return "gpu" if "CUDAExecutionProvider" in onnxruntime.get_available_providers() else "cpu"
+
+
+@functools.lru_cache(maxsize=1)
+def get_ocr(det_model_name: str = DEFAULT_DET_MODEL) -> Optional["CnOcr"]:
+    """
+    获取共享的 CnOcr 实例，首次调用时才导入并初始化
+    
+    模型加载（检测 + 识别两张计算图，数百 MB 权重）只在第一次调用时发生，
+    Navigator、OCRReader、AutoFollower 共用同一个实例。创建后用一张空白小图预热一次，
+    把推理会话的首次初始化开销放在加载阶段，而不是第一次真正识别时。
+    
+    Args:
+        det_model_name: CnOcr 检测模型名称
+        
+    Returns:
+        CnOcr 实例，未安装时返回 None
+    """
+    try:
+        from cnocr import CnOcr
+    except ImportError:
+        return None
+    ocr = CnOcr(det_model_name=det_model_name, context=_default_context())
+    try:
+        ocr.ocr(Image.new("RGB", (64, 32), (255, 255, 255)))
+    except Exception:
+        pass
+    return ocr
+
+
+def downscale_for_ocr(image: Image.Image, max_height: int = OCR_MAX_HEIGHT) -> Image.Image:
+    """
+    图片高度超过 max_height 时等比缩小，小区域截图原样返回
+    
+    Args:
+        image: PIL Image
+        max_height: 最大高度（像素）
+        
+    Returns:
+        缩小后的图片（或原图）
+    """
+    if image.height <= max_height:
+        return image
+    width = max(1, int(image.width * max_height / image.height))
+    return image.resize((width, max_height), Image.BILINEAR)
@@ -2,28 +2,121 @@
 工具函数模块
 """
 
+import atexit
 import json
 import logging
+import logging.handlers
 import os
+import platform
 import random
 import re
+import sys
+import threading
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Union
+from functools import lru_cache
+from typing import Dict, KeysView, List, Optional, Set, Tuple, Union
 
 import numpy as np
 import pyautogui
-from PIL import Image
+import pyperclip
+from PIL import Image, ImageChops, ImageStat
+
+from ..config import _IS_WINDOWS
+
+# orjson 可选：直接读写 UTF-8 字节，速度更快；不可用时回退到标准库 json（输出格式相同）
+# 项目内其他模块（校准、LLM、用户导出）都从这里导入，不再各自判断
+try:
+    import orjson
+    
+    _loads = orjson.loads
+    
+    def _dumps(obj) -> bytes:
+        """缩进 2 格的 UTF-8 JSON（配置、导出文件）"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    def _dumps_line(obj) -> bytes:
+        """单行紧凑 JSON 加换行（JSONL 记录）"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj) -> bytes:
+        """缩进 2 格的 UTF-8 JSON（配置、导出文件）"""
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    
+    def _dumps_line(obj) -> bytes:
+        """单行紧凑 JSON 加换行（JSONL 记录）"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+# macOS 下直接使用 NSPasteboard 写剪贴板，避免 pyperclip 每次 fork/exec pbcopy
+_PASTEBOARD = None
+if platform.system() == "Darwin":
+    try:
+        from AppKit import NSPasteboard, NSPasteboardTypeString
+        _PASTEBOARD = NSPasteboard.generalPasteboard()
+    except ImportError:
+        _PASTEBOARD = None
+
+# Windows 下用 SendInput 的 KEYEVENTF_UNICODE 直接注入字符，不经过剪贴板
+_SEND_INPUT = None
+if platform.system() == "Windows":
+    import ctypes
+    from ctypes import wintypes
+
+    _INPUT_KEYBOARD = 1
+    _KEYEVENTF_KEYUP = 0x0002
+    _KEYEVENTF_UNICODE = 0x0004
+
+    class _KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+        ]
+
+    class _MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+        ]
+
+    class _INPUT_UNION(ctypes.Union):
+        # 联合体需包含最大的 MOUSEINPUT，保证 sizeof(INPUT) 与系统一致
+        _fields_ = [("ki", _KEYBDINPUT), ("mi", _MOUSEINPUT)]
+
+    class _INPUT(ctypes.Structure):
+        _fields_ = [("type", wintypes.DWORD), ("u", _INPUT_UNION)]
+
+    _SEND_INPUT = ctypes.windll.user32.SendInput
 
 # 配置 pyautogui
 pyautogui.FAILSAFE = True  # 移动鼠标到左上角可以中断程序
-pyautogui.PAUSE = 0.1  # 每个操作后暂停 0.1 秒
+pyautogui.PAUSE = 0  # 不在每个操作后统一暂停；需要等待界面响应的地方显式 sleep
+
+
+# 各日志记录器当前的文件日志处理器（按名称）。重复调用 setup_logger 时控制台处理器保留，
+# 文件处理器换成本次运行的新日志文件，旧文件写出剩余记录后关闭
+_FILE_HANDLERS: Dict[str, logging.handlers.MemoryHandler] = {}
+
+# 日志文件缓冲的记录条数；WARNING 及以上级别立即写盘（进程被强制结束时也不丢失），
+# 正常退出时由 logging.shutdown 写出剩余记录
+LOG_BUFFER_RECORDS = 50
 
 
 def setup_logger(name: str, log_dir: str = "logs") -> logging.Logger:
     """
     设置日志记录器
     
+    每次调用都新建一个带时间戳的日志文件（Web 界面每次运行各写各的文件），
+    控制台处理器只添加一次；文件日志经 MemoryHandler 批量写入。
+    
     Args:
         name: 日志记录器名称
         log_dir: 日志文件目录
@@ -38,8 +131,26 @@ def setup_logger(name: str, log_dir: str = "logs") -> logging.Logger:
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
     
-    # 清除已有的处理器
-    logger.handlers.clear()
+    old_handler = _FILE_HANDLERS.pop(name, None)
+    if old_handler is None:
+        # 首次配置：清除已有的处理器，添加控制台处理器
+        logger.handlers.clear()
+        
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_formatter = logging.Formatter(
+            "%(asctime)s - %(levelname)s - %(message)s",
+            datefmt="%H:%M:%S"
+        )
+        console_handler.setFormatter(console_formatter)
+        logger.addHandler(console_handler)
+    else:
+        # 上一次运行的日志文件：写出缓冲的记录后关闭
+        logger.removeHandler(old_handler)
+        old_target = old_handler.target
+        old_handler.close()
+        if old_target is not None:
+            old_target.close()
     
     # 文件处理器
     log_file = os.path.join(
@@ -52,19 +163,15 @@ def setup_logger(name: str, log_dir: str = "logs") -> logging.Logger:
         "%(asctime)s - %(levelname)s - %(message)s"
     )
     file_handler.setFormatter(file_formatter)
-    
-    # 控制台处理器
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter(
-        "%(asctime)s - %(levelname)s - %(message)s",
-        datefmt="%H:%M:%S"
+    buffered_handler = logging.handlers.MemoryHandler(
+        LOG_BUFFER_RECORDS,
+        flushLevel=logging.WARNING,
+        target=file_handler
     )
-    console_handler.setFormatter(console_formatter)
-    
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    buffered_handler.setLevel(logging.DEBUG)
+    logger.addHandler(buffered_handler)
     
+    _FILE_HANDLERS[name] = buffered_handler
     return logger
 
 
@@ -76,23 +183,36 @@ class InterruptHandler:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance._interrupted = False
+            # 用 Event 记录中断状态，等待中的 interruptible_sleep 会被立即唤醒
+            cls._instance._event = threading.Event()
         return cls._instance
     
     @property
     def interrupted(self) -> bool:
-        return self._interrupted
+        return self._event.is_set()
     
     def set_interrupted(self) -> None:
-        self._interrupted = True
+        self._event.set()
         print("\n\n⚠️  收到中断信号，正在安全停止...")
     
     def reset(self) -> None:
-        self._interrupted = False
+        self._event.clear()
+    
+    def wait(self, seconds: float) -> bool:
+        """
+        等待指定时间或直到被中断
+        
+        Args:
+            seconds: 最长等待时间（秒）
+            
+        Returns:
+            被中断返回 True，等满时间返回 False
+        """
+        return self._event.wait(seconds)
     
     def check(self) -> None:
         """检查是否被中断，如果是则抛出 KeyboardInterrupt"""
-        if self._interrupted:
+        if self._event.is_set():
             raise KeyboardInterrupt("用户中断")
 
 
@@ -104,9 +224,13 @@ def interruptible_sleep(seconds: float, check_interval: float = 0.5) -> float:
     """
     可中断的睡眠函数
     
+    在中断事件上等待，set_interrupted 后立即返回，不再轮询。
+    Windows 上主线程阻塞在锁等待中时 Ctrl+C 信号处理函数不会执行，
+    因此仍按 check_interval 分段等待。
+    
     Args:
         seconds: 睡眠时间（秒）
-        check_interval: 检查中断的间隔（秒）
+        check_interval: Windows 下分段等待的间隔（秒）
         
     Returns:
         实际睡眠的时间
@@ -114,12 +238,14 @@ def interruptible_sleep(seconds: float, check_interval: float = 0.5) -> float:
     Raises:
         KeyboardInterrupt: 如果收到中断信号
     """
+    interrupt_handler.check()
+    step = check_interval if _IS_WINDOWS else seconds
     elapsed = 0.0
     while elapsed < seconds:
-        interrupt_handler.check()
-        sleep_time = min(check_interval, seconds - elapsed)
-        time.sleep(sleep_time)
-        elapsed += sleep_time
+        wait_time = min(step, seconds - elapsed)
+        if interrupt_handler.wait(wait_time):
+            raise KeyboardInterrupt("用户中断")
+        elapsed += wait_time
     return elapsed
 
 
@@ -142,10 +268,63 @@ def random_sleep(min_seconds: float, max_seconds: float) -> float:
     return sleep_time
 
 
+def copy_to_clipboard(text: str) -> None:
+    """
+    复制文本到系统剪贴板
+    
+    macOS 且安装了 pyobjc 时直接调用 NSPasteboard，否则回退到 pyperclip。
+    
+    Args:
+        text: 要复制的文本
+    """
+    if _PASTEBOARD is not None:
+        _PASTEBOARD.clearContents()
+        _PASTEBOARD.setString_forType_(text, NSPasteboardTypeString)
+    else:
+        pyperclip.copy(text)
+
+
+def type_unicode(text: str) -> bool:
+    """
+    直接向当前焦点窗口注入文本（不占用剪贴板）
+    
+    目前仅 Windows 支持：所有字符打包成一次 SendInput 调用，
+    非 BMP 字符按 UTF-16 代理对拆分。
+    
+    Args:
+        text: 要输入的文本
+        
+    Returns:
+        是否已注入；返回 False 时调用方应回退到剪贴板粘贴
+    """
+    if _SEND_INPUT is None or not text:
+        return False
+    
+    data = text.encode("utf-16-le")
+    units = [int.from_bytes(data[i:i + 2], "little") for i in range(0, len(data), 2)]
+    inputs = (_INPUT * (len(units) * 2))()
+    for i, unit in enumerate(units):
+        for j, flags in enumerate((_KEYEVENTF_UNICODE, _KEYEVENTF_UNICODE | _KEYEVENTF_KEYUP)):
+            item = inputs[i * 2 + j]
+            item.type = _INPUT_KEYBOARD
+            item.u.ki.wScan = unit
+            item.u.ki.dwFlags = flags
+    
+    sent = _SEND_INPUT(len(inputs), inputs, ctypes.sizeof(_INPUT))
+    return sent == len(inputs)
+
+
+# 标题中需要去除的字符：中文、英文、数字以外的所有字符（标点符号、空格等）
+_NORMALIZE_RE = re.compile(r'[^\u4e00-\u9fa5a-zA-Z0-9]')
+
+
+@lru_cache(maxsize=1024)
 def normalize_title(title: str) -> str:
     """
     标准化标题：去除所有标点符号和空格，用于模糊匹配
     
+    纯函数，结果按标题缓存（同一标题会在重试和多次查重中反复出现）
+    
     Args:
         title: 原始标题
         
@@ -156,7 +335,7 @@ def normalize_title(title: str) -> str:
         return ""
     # 去除所有标点符号（中英文）和空格
     # 保留中文、英文、数字
-    return re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9]', '', title)
+    return _NORMALIZE_RE.sub('', title)
 
 
 def calculate_similarity(img1: Union[np.ndarray, Image.Image], img2: Union[np.ndarray, Image.Image]) -> float:
@@ -172,58 +351,243 @@ def calculate_similarity(img1: Union[np.ndarray, Image.Image], img2: Union[np.nd
     """
     if img1 is None or img2 is None:
         return 0.0
+    
+    # 两张都是 PIL 图片时直接在 Pillow 的 C 实现里求差，不转换为 numpy
+    if isinstance(img1, Image.Image) and isinstance(img2, Image.Image):
+        if img1.size != img2.size or img1.mode != img2.mode:
+            return 0.0
+        diff = ImageChops.difference(img1, img2)
+        # 完全相同时 getbbox 返回 None，无需再统计
+        if diff.getbbox() is None:
+            return 1.0
+        channel_means = ImageStat.Stat(diff).mean
+        return 1.0 - sum(channel_means) / len(channel_means) / 255.0
         
     # 转换为 numpy array
     if isinstance(img1, Image.Image):
-        arr1 = np.array(img1)
+        arr1 = np.asarray(img1)
     else:
         arr1 = img1
         
     if isinstance(img2, Image.Image):
-        arr2 = np.array(img2)
+        arr2 = np.asarray(img2)
     else:
         arr2 = img2
     
     if arr1.shape != arr2.shape:
         return 0.0
         
-    # 计算差异
-    diff = np.abs(arr1.astype(float) - arr2.astype(float))
-    normalized_diff = diff / 255.0
-    similarity = 1.0 - np.mean(normalized_diff)
+    # 计算差异（int16 足以容纳 uint8 相减，避免整幅图转 float64）
+    diff = np.abs(arr1.astype(np.int16) - arr2.astype(np.int16))
+    similarity = 1.0 - diff.mean() / 255.0
+    
+    return float(similarity)
+
+
+def dhash(img: Image.Image) -> int:
+    """
+    计算图片的 64 位差值哈希（dHash）
+    
+    Args:
+        img: PIL Image
+        
+    Returns:
+        64 位整数指纹，相邻像素左暗右亮的位置为 1
+    """
+    gray = np.asarray(img.convert("L").resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    bits = gray[:, 1:] > gray[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """
+    计算两个哈希的汉明距离（不同的位数）
     
-    return similarity
+    Args:
+        hash1: 哈希1
+        hash2: 哈希2
+        
+    Returns:
+        不同的位数
+    """
+    return bin(hash1 ^ hash2).count("1")
 
 
 class HistoryManager:
-    """历史记录管理器"""
+    """
+    历史记录管理器
     
-    def __init__(self, history_file: str = "comment_history.json"):
+    历史记录以 JSONL 追加写入（每行一条 {"account_name", "article_title", "processed_time"}），
+    新增记录只追加一行，不再重写整个文件；加载时按顺序回放到内存中的字典。
+    """
+    
+    # 累计多少条未写盘记录，或距上次写盘多少秒后刷新缓冲区
+    FLUSH_EVERY = 50
+    FLUSH_INTERVAL = 5.0
+    
+    def __init__(self, history_file: str = "comment_history.jsonl"):
         """
         初始化历史记录管理器
         
         Args:
-            history_file: 历史记录文件路径
+            history_file: 历史记录文件路径（JSONL）；文件不存在时会导入同名的旧版 .json 文件
         """
         self.history_file = history_file
         # 确保目录存在
         os.makedirs(os.path.dirname(history_file) or ".", exist_ok=True)
-        self.history: Dict[str, Dict] = self._load_history()
+        self.history: Dict[str, Dict] = {}
+        # (公众号, 标准化标题) 索引，与 self.history 同步维护，查询时不再遍历文章列表
+        self._norm_index: Set[Tuple[str, str]] = set()
+        self._record_count = 0
+        line_count = self._load_history()
+        
+        # 重复行过多，或有记录尚未写入文件（刚从旧格式导入）时压缩重写一次
+        if line_count > 2 * self._record_count or line_count < self._record_count:
+            self.save_history()
+        
+        self._fh = open(self.history_file, "ab", buffering=64 * 1024)
+        # 未写盘的记录数和上次写盘时间；进程退出时自动保存剩余记录
+        self._dirty_count = 0
+        self._last_flush = time.monotonic()
+        # 已写入文件但尚未 fsync
+        self._unsynced = False
+        # 未调用 close() 就退出进程时，自动保存剩余记录
+        atexit.register(self.flush)
     
-    def _load_history(self) -> Dict[str, Dict]:
-        """加载历史记录"""
+    def _load_history(self) -> int:
+        """
+        加载历史记录到 self.history
+        
+        Returns:
+            读取的行数（用于判断是否需要压缩）
+        """
+        line_count = 0
         if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return {}
-        return {}
+            with open(self.history_file, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    line_count += 1
+                    try:
+                        record = _loads(line)
+                        self._apply_record(record["account_name"], record["article_title"], record.get("processed_time", ""))
+                    except (ValueError, KeyError, TypeError):
+                        # 跳过损坏的行（如写入中途被中断的最后一行）
+                        continue
+        
+        # 文件不存在或为空（如旧版打包脚本预先创建的空文件）时导入旧版 JSON 历史
+        if line_count == 0:
+            self._import_legacy_json()
+        return line_count
+    
+    def _import_legacy_json(self) -> None:
+        """导入旧版整文件 JSON 格式的历史记录（{公众号: {"article_list": [...]}}）"""
+        legacy_file = os.path.splitext(self.history_file)[0] + ".json"
+        if legacy_file == self.history_file or not os.path.exists(legacy_file):
+            return
+        try:
+            with open(legacy_file, "rb") as f:
+                legacy = _loads(f.read())
+        except (ValueError, IOError):
+            return
+        
+        for account_name, account_data in legacy.items():
+            # 更早的格式直接在公众号下保存单篇 article_title
+            items = list(account_data.get("article_list", []))
+            if "article_title" in account_data:
+                items.insert(0, account_data)
+            for item in items:
+                self._apply_record(account_name, item.get("article_title", ""), item.get("processed_time", ""))
+    
+    def _apply_record(self, account_name: str, article_title: str, processed_time: str) -> bool:
+        """
+        将一条记录合并到内存字典
+        
+        Returns:
+            是否为新记录（同一公众号下标准化标题相同的文章视为重复）
+        """
+        if not account_name or not article_title:
+            return False
+        
+        # 公众号名称驻留：字典键、索引和集合共用同一个字符串对象
+        account_name = sys.intern(account_name)
+        # 标准化标题只在写入内存时算一次，之后查重只查索引
+        key = (account_name, normalize_title(article_title))
+        if key in self._norm_index:
+            return False
+        self._norm_index.add(key)
+        
+        account_data = self.history.setdefault(account_name, {"article_list": []})
+        account_data["article_list"].append({
+            "article_title": article_title,
+            "processed_time": processed_time,
+        })
+        self._record_count += 1
+        return True
+    
+    def _iter_records(self):
+        """按公众号遍历所有记录，生成写入 JSONL 的行对象"""
+        for account_name, account_data in self.history.items():
+            for item in account_data["article_list"]:
+                yield {
+                    "account_name": account_name,
+                    "article_title": item["article_title"],
+                    "processed_time": item["processed_time"],
+                }
     
     def save_history(self) -> None:
-        """保存历史记录到文件"""
-        with open(self.history_file, "w", encoding="utf-8") as f:
-            json.dump(self.history, f, ensure_ascii=False, indent=2)
+        """将全部历史记录压缩重写到文件（先写临时文件再原子替换）"""
+        fh = getattr(self, "_fh", None)
+        if fh is not None:
+            fh.close()
+        
+        tmp_file = self.history_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(b"".join(_dumps_line(record) for record in self._iter_records()))
+            # 确认落盘后再替换，替换前崩溃时原文件保持完整
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.history_file)
+        
+        if fh is not None:
+            self._fh = open(self.history_file, "ab", buffering=64 * 1024)
+            self._dirty_count = 0
+            self._last_flush = time.monotonic()
+            self._unsynced = False
+    
+    def flush(self, sync: bool = True) -> None:
+        """
+        将缓冲区中尚未写盘的记录写入文件
+        
+        Args:
+            sync: 是否同时 fsync 到磁盘；add_record 的批量写入不 fsync，
+                  只在显式调用和进程退出时同步
+        """
+        if self._fh is None:
+            return
+        if self._dirty_count:
+            self._fh.flush()
+            self._dirty_count = 0
+            self._last_flush = time.monotonic()
+            self._unsynced = True
+        if sync and self._unsynced:
+            os.fsync(self._fh.fileno())
+            self._unsynced = False
+    
+    def close(self) -> None:
+        """
+        保存剩余记录并关闭追加写入的文件句柄，同时取消退出时的自动保存
+        
+        同一进程中多次创建实例（如 Web 界面每次运行新建机器人）时，旧实例用完应关闭，
+        否则句柄和退出回调会不断累积，且新实例压缩重写文件后旧句柄仍指向被替换掉的文件。
+        关闭后不能再添加记录；重复调用无副作用。
+        """
+        if self._fh is None:
+            return
+        self.flush()
+        self._fh.close()
+        self._fh = None
+        atexit.unregister(self.flush)
     
     def is_processed(self, account_name: str, article_title: str) -> bool:
         """
@@ -239,24 +603,7 @@ class HistoryManager:
         Returns:
             如果已处理返回 True，否则返回 False
         """
-        if account_name in self.history:
-            account_data = self.history[account_name]
-            
-            # 兼容旧格式：如果 account_data 直接包含 article_title
-            if "article_title" in account_data:
-                saved_title = account_data.get("article_title", "")
-                if normalize_title(saved_title) == normalize_title(article_title):
-                    return True
-            
-            # 新格式：article_list
-            if "article_list" in account_data:
-                normalized_target = normalize_title(article_title)
-                for item in account_data["article_list"]:
-                    saved_title = item.get("article_title", "")
-                    if normalize_title(saved_title) == normalized_target:
-                        return True
-                        
-        return False
+        return (account_name, normalize_title(article_title)) in self._norm_index
     
     def is_account_processed(self, account_name: str) -> bool:
         """
@@ -271,14 +618,17 @@ class HistoryManager:
         # 只要在历史记录中有 key，就算处理过（无论处理了多少文章）
         return account_name in self.history
     
-    def get_processed_accounts(self) -> set:
+    def get_processed_accounts(self) -> KeysView:
         """
-        获取所有已处理的公众号名称集合
+        获取所有已处理的公众号名称
+        
+        返回历史字典的键视图：不复制，成员判断 O(1)，并随新记录自动更新；
+        需要独立副本时由调用方 set(...)。
         
         Returns:
-            已处理公众号名称的集合
+            已处理公众号名称的只读视图
         """
-        return set(self.history.keys())
+        return self.history.keys()
     
     def add_record(
         self, 
@@ -288,7 +638,8 @@ class HistoryManager:
         """
         添加处理记录
         
-        如果公众号名称或文章标题为空，则跳过不记录。
+        如果公众号名称或文章标题为空，则跳过不记录；
+        同一公众号下已有相同（标准化后）标题的文章时不重复添加。
         
         Args:
             account_name: 公众号名称
@@ -299,49 +650,21 @@ class HistoryManager:
             return
         if not article_title or not article_title.strip():
             return
-            
-        # 准备新记录项
-        new_record = {
-            "article_title": article_title,
-            "processed_time": datetime.now().isoformat(),
-        }
         
-        if account_name not in self.history:
-            # 新公众号
-            self.history[account_name] = {
-                "article_list": [new_record]
-            }
-        else:
-            # 已存在的公众号
-            account_data = self.history[account_name]
-            
-            # 兼容旧格式迁移：如果有 article_title，将其移入 article_list
-            if "article_title" in account_data:
-                old_record = {
-                    "article_title": account_data.pop("article_title"),
-                    "processed_time": account_data.pop("processed_time", "")
-                }
-                if "article_list" not in account_data:
-                    account_data["article_list"] = []
-                account_data["article_list"].append(old_record)
-            
-            # 确保 article_list 存在
-            if "article_list" not in account_data:
-                account_data["article_list"] = []
-            
-            # 检查是否重复（避免重复添加）
-            normalized_target = normalize_title(article_title)
-            exists = False
-            for item in account_data["article_list"]:
-                if normalize_title(item.get("article_title", "")) == normalized_target:
-                    exists = True
-                    # 更新时间戳？或者保留最早的？这里选择不重复添加
-                    break
-            
-            if not exists:
-                account_data["article_list"].append(new_record)
+        processed_time = datetime.now().isoformat()
+        if not self._apply_record(account_name, article_title, processed_time):
+            return
         
-        self.save_history()
+        # 追加一行；攒够一批或间隔足够久才刷新缓冲区
+        self._fh.write(_dumps_line({
+            "account_name": account_name,
+            "article_title": article_title,
+            "processed_time": processed_time,
+        }))
+        self._dirty_count += 1
+        if (self._dirty_count >= self.FLUSH_EVERY
+                or time.monotonic() - self._last_flush > self.FLUSH_INTERVAL):
+            self.flush(sync=False)
     
     def get_summary(self) -> Dict:
         """
@@ -4,12 +4,13 @@
 
 import os
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, Tuple, TYPE_CHECKING
 
-import pyautogui
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
-from .navigator import SCREEN_SCALE
+from .navigator import fast_screenshot, screen_scale
 
 if TYPE_CHECKING:
     from .calibration import CalibrationData
@@ -23,14 +24,34 @@ COLORS = {
     "ocr_title": (255, 165, 0),            # 橙色 - 文章标题 OCR 区域
 }
 
+# 标注的公众号列表位置数量
+ACCOUNT_POINTS = 3
+
 # 标签文字
 LABELS = {
-    "navigator_account": "公众号列表 (1-3)",
+    "navigator_account": f"公众号列表 (1-{ACCOUNT_POINTS})",
     "navigator_article": "文章位置",
     "ocr_name": "公众号名称 OCR",
     "ocr_title": "文章标题 OCR",
 }
 
+# 标签字体（加载一次）
+_FONT = ImageFont.load_default()
+
+
+@lru_cache(maxsize=128)
+def _measure(text: str) -> Tuple[int, int, int, int]:
+    """
+    测量标签文字相对绘制起点的边界框（同样的标签反复出现，结果缓存）
+    
+    Args:
+        text: 标签文字
+        
+    Returns:
+        (left, top, right, bottom)，以 (0, 0) 为绘制起点
+    """
+    return ImageDraw.Draw(Image.new("L", (1, 1))).textbbox((0, 0), text, font=_FONT)
+
 
 class CalibrationVisualizer:
     """校准可视化器"""
@@ -60,36 +81,45 @@ class CalibrationVisualizer:
         Returns:
             保存的文件路径
         """
-        # 截取整个屏幕
-        screenshot = pyautogui.screenshot()
+        # 截取整个屏幕（macOS 下经 Quartz 直接取像素，不经 screencapture 子进程）
+        screenshot = fast_screenshot()
         screen_width, screen_height = screenshot.size
         
         # 窗口坐标 (使用全屏)
         window_x = 0
         window_y = 0
         
-        # 在截图上绘制屏幕边框
-        annotated = self._draw_window_border(
-            screenshot, 
+        # 所有标注画在同一张透明图层上，最后一次性合成到截图
+        overlay = Image.new("RGBA", screenshot.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay, "RGBA")
+        
+        # 绘制屏幕边框
+        self._draw_window_border(
+            draw, 
             window_x, 
             window_y, 
             screen_width, 
             screen_height
         )
         
-        # 在截图上绘制标注
-        annotated = self._draw_annotations(
-            annotated, 
+        # 绘制标注
+        self._draw_annotations(
+            draw, 
             calibration, 
             window_x, 
             window_y
         )
         
         # 添加图例
-        annotated = self._draw_legend(annotated)
+        self._draw_legend(draw, screen_width)
         
         # 添加信息
-        annotated = self._draw_info(annotated, screen_width, screen_height)
+        self._draw_info(draw, screen_width, screen_height)
+        
+        # 以图层的 alpha 为蒙版直接贴到 RGB 截图上（等价于不透明底图上的 alpha 合成），
+        # 省去整屏转换 RGBA 再转回 RGB 的两次拷贝
+        annotated = screenshot.convert("RGB") if screenshot.mode != "RGB" else screenshot
+        annotated.paste(overlay, (0, 0), overlay)
         
         # 生成文件名
         if output_filename is None:
@@ -104,25 +134,20 @@ class CalibrationVisualizer:
     
     def _draw_window_border(
         self,
-        image: Image.Image,
+        draw: ImageDraw.ImageDraw,
         x: int,
         y: int,
         width: int,
         height: int
-    ) -> Image.Image:
+    ) -> None:
         """
         绘制微信窗口边框
         
         Args:
-            image: 原始截图
+            draw: 标注图层的绘制对象
             x, y: 窗口左上角坐标
             width, height: 窗口尺寸
-            
-        Returns:
-            添加边框后的图像
         """
-        draw = ImageDraw.Draw(image, "RGBA")
-        
         # 绘制窗口边框（白色）
         border_color = (255, 255, 255)
         draw.rectangle(
@@ -162,28 +187,21 @@ class CalibrationVisualizer:
         
         # 在窗口顶部绘制标签
         self._draw_label(draw, x + 50, y + 10, "微信窗口", (255, 255, 255))
-        
-        return image
     
     def _draw_info(
         self,
-        image: Image.Image,
+        draw: ImageDraw.ImageDraw,
         width: int,
         height: int
-    ) -> Image.Image:
+    ) -> None:
         """
         在图像左上角绘制信息
         
         Args:
-            image: 原始图像
+            draw: 标注图层的绘制对象
             width: 屏幕宽度
             height: 屏幕高度
-            
-        Returns:
-            添加信息后的图像
         """
-        draw = ImageDraw.Draw(image, "RGBA")
-        
         # 信息文字
         info_lines = [
             f"屏幕大小: {width} x {height}",
@@ -207,41 +225,33 @@ class CalibrationVisualizer:
         for line in info_lines:
             draw.text((20, y), line, fill=(255, 255, 255))
             y += line_height
-        
-        return image
     
     def _draw_annotations(
         self,
-        image: Image.Image,
+        draw: ImageDraw.ImageDraw,
         calibration: "CalibrationData",
         offset_x: int,
         offset_y: int
-    ) -> Image.Image:
+    ) -> None:
         """
         在图像上绘制校准位置标注
         
         Args:
-            image: 原始截图
+            draw: 标注图层的绘制对象
             calibration: 校准数据
             offset_x: 窗口 X 偏移
             offset_y: 窗口 Y 偏移
-            
-        Returns:
-            标注后的图像
         """
-        # 创建可绘制对象
-        draw = ImageDraw.Draw(image, "RGBA")
-        
         nav = calibration.navigator
         ocr = calibration.ocr
-        # 截图为物理像素（Retina 2x），校准为逻辑坐标，需乘以 SCREEN_SCALE 再绘制
-        s = SCREEN_SCALE
+        # 截图为物理像素（Retina 2x），校准为逻辑坐标，需乘以缩放比例再绘制
+        s = screen_scale()
         
-        # 1. 绘制公众号列表位置（前3个位置）
+        # 1. 绘制公众号列表位置（前 N 个位置，一次算出所有纵坐标）
         color = COLORS["navigator_account"]
-        for i in range(3):
-            x = offset_x + int(nav.account_list_x * s)
-            y = offset_y + int((nav.account_list_y_start + (i * nav.account_item_height)) * s)
+        x = offset_x + int(nav.account_list_x * s)
+        ys = offset_y + ((nav.account_list_y_start + np.arange(ACCOUNT_POINTS) * nav.account_item_height) * s).astype(int)
+        for i, y in enumerate(ys.tolist()):
             self._draw_point(draw, x, y, color, str(i + 1))
         
         # 2. 绘制文章位置
@@ -265,8 +275,6 @@ class CalibrationVisualizer:
         x2 = offset_x + int((ocr.article_title_x + ocr.article_title_width) * s)
         y2 = offset_y + int((ocr.article_title_y + ocr.article_title_height) * s)
         self._draw_rect(draw, x1, y1, x2, y2, color, "标题")
-        
-        return image
     
     def _draw_point(
         self,
@@ -317,29 +325,25 @@ class CalibrationVisualizer:
     ) -> None:
         """绘制文字标签"""
         # 绘制背景
-        bbox = draw.textbbox((x, y), text)
+        left, top, right, bottom = _measure(text)
         padding = 2
         draw.rectangle(
-            [bbox[0] - padding, bbox[1] - padding, bbox[2] + padding, bbox[3] + padding],
+            [x + left - padding, y + top - padding, x + right + padding, y + bottom + padding],
             fill=(0, 0, 0, 200)
         )
         # 绘制文字
-        draw.text((x, y), text, fill=color)
+        draw.text((x, y), text, fill=color, font=_FONT)
     
-    def _draw_legend(self, image: Image.Image) -> Image.Image:
+    def _draw_legend(self, draw: ImageDraw.ImageDraw, image_width: int) -> None:
         """
         在图像右上角绘制图例
         
         Args:
-            image: 原始图像
-            
-        Returns:
-            添加图例后的图像
+            draw: 标注图层的绘制对象
+            image_width: 图像宽度
         """
-        draw = ImageDraw.Draw(image, "RGBA")
-        
         # 图例位置和尺寸
-        legend_x = image.width - 220
+        legend_x = image_width - 220
         legend_y = 10
         line_height = 22
         box_size = 15
@@ -348,7 +352,7 @@ class CalibrationVisualizer:
         legend_items = list(LABELS.items())
         legend_height = len(legend_items) * line_height + 30
         draw.rectangle(
-            [legend_x - 10, legend_y - 5, image.width - 10, legend_y + legend_height],
+            [legend_x - 10, legend_y - 5, image_width - 10, legend_y + legend_height],
             fill=(0, 0, 0, 200),
             outline=(255, 255, 255),
             width=1
@@ -369,8 +373,6 @@ class CalibrationVisualizer:
             # 文字
             draw.text((legend_x + box_size + 5, current_y), label, fill=(255, 255, 255))
             current_y += line_height
-        
-        return image
 
 
 def verify_calibration(
@@ -3,9 +3,18 @@
 """
 
 import os
+import platform
 import sys
+from dataclasses import dataclass
 from datetime import datetime
 
+# Python 3.10+ 的 dataclass 支持 slots：属性直接存放在槽位中，读取比字典查找更快
+# （项目内所有 dataclass 共用此选项）
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# 运行平台（模块加载时判断一次，各模块从这里导入）
+_IS_WINDOWS = platform.system() == "Windows"
+
 def get_app_root():
     """获取应用根目录（用户数据存储目录，配置/日志/模型等）"""
     if getattr(sys, 'frozen', False):
@@ -48,21 +57,25 @@ MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
 # 留言内容
 COMMENT_TEXT = "已关注，盼回。"
 
-# 操作间隔时间配置（秒）
-TIMING = {
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
+class TimingConfig:
+    """操作间隔时间配置（秒）"""
     # 点击公众号后等待详情页加载
-    "page_load_wait": 2.0,
+    page_load_wait: float = 2.0
     # 点击文章后等待文章页加载
-    "article_load_wait": 3.0,
+    article_load_wait: float = 3.0
     # 滚动间隔
-    "scroll_interval": 0.5,
+    scroll_interval: float = 0.5
     # 公众号之间的随机等待范围
-    "account_interval_min": 2,
-    "account_interval_max": 8,
+    account_interval_min: float = 2
+    account_interval_max: float = 8
     # 输入留言后等待发送的随机范围
-    "comment_wait_min": 3,
-    "comment_wait_max": 10,
-}
+    comment_wait_min: float = 3
+    comment_wait_max: float = 10
+
+
+# 操作间隔时间配置（秒）
+TIMING = TimingConfig()
 
 # 日志文件目录
 LOG_DIR = os.path.join(PROJECT_DIR, "logs")
@@ -74,24 +87,28 @@ CONFIG_DIR = os.path.join(PROJECT_DIR, "config")
 # 不再包含日期，所有历史记录合并到一个文件
 HISTORY_FILE = os.path.join(
     CONFIG_DIR, 
-    "comment_history.json"
+    "comment_history.jsonl"
 )
 
 # 确保必要的目录存在
 os.makedirs(LOG_DIR, exist_ok=True)
 os.makedirs(CONFIG_DIR, exist_ok=True)
 
-# 微信窗口配置
-WECHAT = {
+@dataclass(frozen=True, **_DATACLASS_OPTIONS)
+class WechatConfig:
+    """微信窗口配置"""
     # 微信窗口标题关键字
-    "window_title": "微信",
+    window_title: str = "微信"
     # 公众号列表区域相对于窗口的偏移（需要根据实际情况调整）
-    "account_list_x_offset": 400,  # 公众号列表 X 偏移
-    "account_list_y_start": 120,   # 公众号列表 Y 起始位置
-    "account_item_height": 70,     # 每个公众号项的高度
+    account_list_x_offset: int = 400  # 公众号列表 X 偏移
+    account_list_y_start: int = 120   # 公众号列表 Y 起始位置
+    account_item_height: int = 70     # 每个公众号项的高度
     # 每次可见的公众号数量（大约）
-    "visible_accounts": 10,
-}
+    visible_accounts: int = 10
+
+
+# 微信窗口配置
+WECHAT = WechatConfig()
 
 # Ollama 配置（使用系统安装的 Ollama）
 OLLAMA_CONFIG = {
@@ -4,11 +4,11 @@
 使用方法：
     uv run python -m wechat_gzh.get_users
 """
-import json
 import os
 import sys
 
 from .api import WeChatAPI
+from .automation.utils import _dumps
 
 
 def main():
@@ -50,16 +50,15 @@ def main():
         
         # 保存到 JSON 文件
         output_file = os.path.join(output_dir, "users_info.json")
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(user_info_list, f, ensure_ascii=False, indent=2)
+        with open(output_file, "wb") as f:
+            f.write(_dumps(user_info_list))
         
         print(f"\n\n用户信息已保存到文件: {output_file}")
         
         # 保存用户 openid 列表到文本文件
         openid_file = os.path.join(output_dir, "users_openid.txt")
         with open(openid_file, "w", encoding="utf-8") as f:
-            for user in user_info_list:
-                f.write(f"{user.get('openid', '')}\n")
+            f.write("".join(f"{user.get('openid', '')}\n" for user in user_info_list))
         
         print(f"用户 OpenID 列表已保存到文件: {openid_file}")
         
@@ -4,29 +4,136 @@ LLM 评论生成模块 - 使用大模型生成智能评论
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import time
 import os
 import sys
 import subprocess
+import threading
 import atexit
-import socket
+import http.client
 import platform
+import re
+import shutil
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 
+import numpy as np
+import psutil
+import requests
+
+from .automation.utils import _loads
 from .config import OLLAMA_CONFIG, PROJECT_DIR
 
 try:
+    import httpx
     from openai import OpenAI
     HAS_OPENAI = True
 except ImportError:
     HAS_OPENAI = False
+    httpx = None  # type: ignore
     OpenAI = None  # type: ignore
 
 logger = logging.getLogger("wechat-gzh")
 
+# 本地 Ollama 请求附带的参数：模型在两次请求之间保持加载
+OLLAMA_EXTRA_BODY = {"keep_alive": "30m"}
+
+# LLM 客户端连接池：保持长连接，每次请求不再重新建立连接
+HTTP_MAX_KEEPALIVE = 16
+HTTP_MAX_CONNECTIONS = 32
+HTTP_KEEPALIVE_EXPIRY = 300.0
+
+# 物理内存总量（GB）低于阈值时改用更小的模型，避免模型换页导致生成极慢
+# 按总量而非当前可用量判断（macOS 报告的可用内存通常很低），结果不随运行时负载变化
+# 按 (阈值, 模型) 从小到大排列；Ollama 默认标签即为 Q4_K_M 量化版本
+LOW_MEMORY_MODELS = [
+    (4.0, "qwen2.5:0.5b"),
+    (8.0, "qwen2.5:1.5b"),
+]
+
+# 生成参数（同时参与评论缓存的键）
+COMMENT_TEMPERATURE = 0.7
+COMMENT_MAX_TOKENS = 50  # 评论通常很短，减少生成token数（Ollama 会映射为 num_predict）
+# 评论只有一段，模型开始换段或另起"评论"标题时立即停止
+COMMENT_STOP = ["\n\n", "\n评论"]
+# 单次生成超时（秒），慢请求尽早失败并进入重试；只在模型确认已加载后使用
+COMMENT_TIMEOUT = 15.0
+# 模型尚未确认加载（预热未完成或失败）时的生成超时：冷启动加载模型可能需要数十秒，
+# 用短超时会连续超时 MAX_RETRIES 次而退出整个程序
+COMMENT_COLD_TIMEOUT = 120.0
+
+# 单句模式（persona 配置 "single_sentence": true）下，流式输出达到此长度且以句末标点结尾即停止（不等服务端判断结束）
+STREAM_STOP_MIN_CHARS = 20
+STREAM_STOP_CHARS = "。！？"
+
+# 提示词中文章内容的最大字符数（评论生成通常前 800 个字符已足够理解大意）
+ARTICLE_PROMPT_CHARS = 800
+# OCR 文本中的连续空白（换行、缩进等）合并为一个空格，减少 token 数
+_WS_RE = re.compile(r"\s+")
+
+# 评论精确缓存：相同模型 + 提示词 + 参数直接复用上次生成的评论（转载文章常在多个公众号出现）
+COMMENT_CACHE_SIZE = 512
+COMMENT_CACHE_FILE = Path(PROJECT_DIR) / ".cache" / "llm_comments.json"
+
+# 语义缓存（设置环境变量 SEMANTIC_CACHE=1 启用，仅本地 Ollama）：
+# 用文章开头的向量找近似重复的文章（同一新闻略加改动后转载），余弦相似度达到阈值时复用评论
+SEMANTIC_CACHE_MODEL = os.environ.get("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_CHARS = 800
+SEMANTIC_CACHE_SIZE = 512
+
+
+@lru_cache(maxsize=1)
+def _find_ollama() -> Optional[str]:
+    """查找系统安装的 ollama 可执行文件（进程运行期间不会变化，只查找一次）"""
+    return shutil.which("ollama")
+
+
+# 进程内所有生成器共享的评论缓存（Web 界面每次运行都会新建生成器），首次使用时加载
+_exact_cache: Optional["OrderedDict[str, str]"] = None
+
+
+def _load_exact_cache() -> "OrderedDict[str, str]":
+    """加载上次运行保存的评论缓存，文件不存在或损坏时返回空缓存"""
+    try:
+        with open(COMMENT_CACHE_FILE, "rb") as f:
+            return OrderedDict(_loads(f.read()))
+    except (OSError, ValueError, TypeError):
+        return OrderedDict()
+
+
+def _save_exact_cache() -> None:
+    """保存评论缓存，供下次运行复用"""
+    if not _exact_cache:
+        return
+    try:
+        COMMENT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(COMMENT_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump(list(_exact_cache.items()), f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"保存评论缓存失败: {e}")
+
+
+def _shared_exact_cache() -> "OrderedDict[str, str]":
+    """
+    获取共享的评论缓存，首次调用时从文件加载并注册一次退出时保存
+    
+    所有实例写入同一个字典、退出时只保存一次，避免多个实例各自保存时旧实例覆盖新结果。
+    
+    Returns:
+        评论缓存：缓存键 -> 评论（LRU）
+    """
+    global _exact_cache
+    if _exact_cache is None:
+        _exact_cache = _load_exact_cache()
+        atexit.register(_save_exact_cache)
+    return _exact_cache
+
 
 class OllamaServiceManager:
     """Ollama 服务管理器（使用系统安装的 Ollama）"""
@@ -37,21 +144,52 @@ class OllamaServiceManager:
         self.host = host
         self.port = port
         self.process: Optional[subprocess.Popen] = None
+        # 上次确认服务可用的时间，短时间内不重复探测
+        self._last_ok = 0.0
+        # 健康检查复用同一个 keep-alive 连接（直连本机，不经过代理）
+        self._probe_conn: Optional[http.client.HTTPConnection] = None
        
         if not OllamaServiceManager._cleanup_registered:
             atexit.register(self.cleanup)
             OllamaServiceManager._cleanup_registered = True
 
+    # 确认可用后多少秒内不再重复探测
+    HEALTH_TTL = 2.0
+
     def is_running(self) -> bool:
-        """检查 Ollama 服务是否正在运行"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex((self.host, self.port))
-            sock.close()
-            return result == 0
-        except Exception:
-            return False
+        """
+        检查 Ollama 服务是否正在运行
+        
+        请求 /api/tags 确认 HTTP 服务已就绪（端口可连接不代表已能处理请求），
+        成功结果缓存 HEALTH_TTL 秒。
+        """
+        if time.monotonic() - self._last_ok < self.HEALTH_TTL:
+            return True
+        # 复用的连接可能已被服务端关闭，失败时用新连接再试一次
+        for _ in range(2):
+            reused = self._probe_conn is not None
+            if not reused:
+                self._probe_conn = http.client.HTTPConnection(self.host, self.port, timeout=0.2)
+            try:
+                self._probe_conn.request("GET", "/api/tags")
+                response = self._probe_conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    return False
+            except Exception:
+                self._close_probe()
+                if reused:
+                    continue
+                return False
+            self._last_ok = time.monotonic()
+            return True
+        return False
+    
+    def _close_probe(self) -> None:
+        """关闭健康检查连接"""
+        if self._probe_conn is not None:
+            self._probe_conn.close()
+            self._probe_conn = None
     
     def ensure_running(self) -> bool:
         """确保 Ollama 服务正在运行"""
@@ -59,18 +197,9 @@ class OllamaServiceManager:
             logger.info(f"Ollama 服务已在运行 ({self.host}:{self.port})")
             return True
   
-        # 检查系统是否安装了 ollama
-        try:
-            result = subprocess.run(
-                ["ollama", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                logger.warning("系统未安装 Ollama，请先安装: https://ollama.ai")
-                return False
-        except (subprocess.TimeoutExpired, FileNotFoundError):
+        # 检查系统是否安装了 ollama（在 PATH 中查找，无需启动子进程）
+        ollama_path = _find_ollama()
+        if not ollama_path:
             logger.warning("系统未安装 Ollama，请先安装: https://ollama.ai")
             return False
 
@@ -86,7 +215,7 @@ class OllamaServiceManager:
             env["OLLAMA_HOST"] = f"{self.host}:{self.port}"
             
             self.process = subprocess.Popen(
-                ["ollama", "serve"],
+                [ollama_path, "serve"],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 start_new_session=True,
@@ -94,15 +223,17 @@ class OllamaServiceManager:
                 startupinfo=startupinfo
             )
             
+            # 轮询间隔从 10ms 开始逐步放大到 100ms，服务就绪后尽快检测到
             max_wait = 15
-            wait_interval = 0.5
-            waited = 0
-            while waited < max_wait:
+            start_time = time.monotonic()
+            deadline = start_time + max_wait
+            delay = 0.01
+            while time.monotonic() < deadline:
                 if self.is_running():
-                    logger.info(f"Ollama 服务启动成功 (等待 {waited:.1f}s)")
+                    logger.info(f"Ollama 服务启动成功 (等待 {time.monotonic() - start_time:.1f}s)")
                     return True
-                time.sleep(wait_interval)
-                waited += wait_interval
+                time.sleep(delay)
+                delay = min(delay * 1.5, 0.1)
             
             if self.process.poll() is not None:
                 _, stderr = self.process.communicate()
@@ -127,15 +258,17 @@ class OllamaServiceManager:
                 startupinfo = subprocess.STARTUPINFO()
                 startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
                 
-            # 设置环境变量（主要针对内置 Ollama 需要 OLLAMA_MODELS）
+            ollama_path = _find_ollama()
+            if not ollama_path:
+                logger.error("系统未安装 Ollama，无法拉取模型")
+                return False
+
+            # 向当前使用的 Ollama 服务拉取模型
             env = os.environ.copy()
-            if self.is_embedded:
-                models_path = os.path.join(PROJECT_DIR, OLLAMA_CONFIG["models_path"])
-                env["OLLAMA_MODELS"] = models_path
-                env["OLLAMA_HOST"] = f"{self.host}:{self.port}"
+            env["OLLAMA_HOST"] = f"{self.host}:{self.port}"
 
             subprocess.run(
-                [self.cmd, "pull", model_name],
+                [ollama_path, "pull", model_name],
                 check=True,
                 env=env,
                 startupinfo=startupinfo
@@ -151,6 +284,7 @@ class OllamaServiceManager:
 
     def cleanup(self) -> None:
         """清理 Ollama 服务进程"""
+        self._close_probe()
         if self.process is not None:
             try:
                 logger.info("正在停止 Ollama 服务...")
@@ -172,11 +306,57 @@ class LLMCommentGenerator:
     
     def __init__(self, config_path: Optional[Path] = None):
         self.client: Optional["OpenAI"] = None  # type: ignore
+        # 仅本地 Ollama 时附带 keep_alive 等扩展参数（OpenAI 接口不接受未知参数）
+        self._extra_body: Optional[Dict[str, Any]] = None
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_result: Dict[str, Any] = {"success": False, "error": None}
+        # 模型是否已确认加载到内存（预热或一次生成成功后为 True），决定生成超时
+        self._model_warm = False
         self.ollama_manager: Optional[OllamaServiceManager] = None
         self.config_path = config_path
         self.task_config: Optional[Dict[str, Any]] = None
-        self._initialize()
+        # 模型名称和 persona 提示词在加载时解析一次，生成时直接使用
+        self._model_name = os.environ.get("OPENAI_MODEL") or self._get_default_model()
+        self._system_prompt = ""
+        self._user_prompt_template = ""
+        self._single_sentence = False
+        self._exact_cache = _shared_exact_cache()
+        # 语义缓存：归一化的文章向量及对应评论；_sem_matrix 为堆叠后的矩阵，新增条目时失效
+        self._semantic_cache_enabled = os.environ.get("SEMANTIC_CACHE") == "1"
+        self._sem_keys: List[np.ndarray] = []
+        self._sem_vals: List[str] = []
+        self._sem_matrix: Optional[np.ndarray] = None
+        # 先加载提示词，预热请求需要带上系统提示词
         self._load_task_config()
+        self._initialize()
+        # 客户端和提示词只在初始化时校验一次，生成评论时只检查 _ready；不可用原因留作日志
+        if self.client is None:
+            self._not_ready_reason = "LLM 客户端不可用"
+        elif not self.task_config:
+            self._not_ready_reason = "配置未加载"
+        elif not self._system_prompt or not self._user_prompt_template:
+            self._not_ready_reason = "未找到默认 persona 配置，或系统提示词/用户提示词为空"
+            logger.error(f"{self._not_ready_reason}，LLM 评论生成已禁用")
+        else:
+            self._not_ready_reason = ""
+        self._ready = not self._not_ready_reason
+    
+    @staticmethod
+    def _cache_key(model_name: str, system_prompt: str, user_prompt: str) -> str:
+        """评论缓存键：模型、提示词和生成参数的 sha256"""
+        payload = json.dumps(
+            {
+                "m": model_name,
+                "s": system_prompt,
+                "u": user_prompt,
+                "t": COMMENT_TEMPERATURE,
+                "mx": COMMENT_MAX_TOKENS,
+                "st": COMMENT_STOP,
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
     
     def _initialize(self) -> None:
         """初始化 LLM 客户端"""
@@ -203,8 +383,20 @@ class LLMCommentGenerator:
             if not api_key or api_key == "ollama":
                 api_key = "ollama"
             
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+            self.client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            if self.ollama_manager is not None:
+                self._extra_body = OLLAMA_EXTRA_BODY
             logger.info(f"LLM 客户端初始化成功: {base_url}")
+            # 立即在后台加载模型，首篇文章生成评论时模型已在内存中
+            self._start_warmup()
         except Exception as e:
             logger.warning(f"LLM 客户端初始化失败: {e}")
     
@@ -212,6 +404,59 @@ class LLMCommentGenerator:
         """检查 LLM 客户端是否可用"""
         return self.client is not None
     
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        调用本地 Ollama 计算文本向量
+        
+        Args:
+            text: 文本
+            
+        Returns:
+            归一化的 float32 向量，语义缓存未启用或请求失败时返回 None
+        """
+        if not self._semantic_cache_enabled or self.ollama_manager is None:
+            return None
+        try:
+            response = requests.post(
+                f"http://{self.ollama_manager.host}:{self.ollama_manager.port}/api/embeddings",
+                json={"model": SEMANTIC_CACHE_MODEL, "prompt": text},
+                timeout=5
+            )
+            response.raise_for_status()
+            vector = np.asarray(response.json()["embedding"], dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"计算文章向量失败，跳过语义缓存: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+    
+    def _semantic_lookup(self, query: np.ndarray) -> Optional[str]:
+        """查找与 query 足够相似的已缓存文章，返回其评论"""
+        if not self._sem_keys:
+            return None
+        if self._sem_matrix is None:
+            self._sem_matrix = np.stack(self._sem_keys)
+        if self._sem_matrix.shape[1] != query.shape[0]:
+            return None
+        # 向量已归一化，点积即余弦相似度
+        sims = self._sem_matrix @ query
+        best = int(np.argmax(sims))
+        if sims[best] >= SEMANTIC_CACHE_THRESHOLD:
+            logger.info(f"命中语义缓存 (相似度 {sims[best]:.3f}): {self._sem_vals[best]}")
+            return self._sem_vals[best]
+        return None
+    
+    def _semantic_store(self, query: np.ndarray, comment: str) -> None:
+        """记录文章向量和生成的评论，超出容量时丢弃最早的条目"""
+        self._sem_keys.append(query)
+        self._sem_vals.append(comment)
+        if len(self._sem_keys) > SEMANTIC_CACHE_SIZE:
+            del self._sem_keys[0]
+            del self._sem_vals[0]
+        self._sem_matrix = None
+    
     def _get_default_model(self) -> str:
         """获取默认模型名称"""
         base_url = os.environ.get("OPENAI_BASE_URL", "")
@@ -223,6 +468,17 @@ class LLMCommentGenerator:
             if model:
                 return model
             
+            # 内存较小的机器选择能装下的较小模型
+            total_gb = self._total_memory_gb()
+            if total_gb is not None:
+                for threshold, small_model in LOW_MEMORY_MODELS:
+                    if total_gb < threshold:
+                        logger.warning(
+                            f"物理内存 {total_gb:.1f}GB，改用较小的模型 {small_model}"
+                            f"（可通过环境变量 OLLAMA_MODEL 指定模型）"
+                        )
+                        return small_model
+            
             # 默认模型策略
             if platform.system() == "Windows":
                 # Windows 下使用 1.5b 模型以提高速度
@@ -233,6 +489,14 @@ class LLMCommentGenerator:
         else:
             return "gpt-3.5-turbo"
     
+    @staticmethod
+    def _total_memory_gb() -> Optional[float]:
+        """获取物理内存总量（GB），获取失败时返回 None"""
+        try:
+            return psutil.virtual_memory().total / (1024 ** 3)
+        except Exception:
+            return None
+    
     def _load_task_config(self) -> None:
         """加载 task_prompt.json 配置文件"""
         if self.config_path is None:
@@ -243,12 +507,44 @@ class LLMCommentGenerator:
             return
         
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                self.task_config = json.load(f)
+            with open(self.config_path, "rb") as f:
+                self.task_config = _loads(f.read())
             logger.info(f"已加载配置: {self.config_path}")
         except Exception as e:
             logger.error(f"加载配置失败: {e}")
             self.task_config = None
+            return
+        
+        persona = (self.task_config or {}).get("task_comment_generation", {}).get("default") or {}
+        self._system_prompt = persona.get("system_prompt", "")
+        self._user_prompt_template = persona.get("user_prompt", "")
+        # 评论只需一句时，生成出第一句完整的话即停止；默认生成完整评论
+        self._single_sentence = bool(persona.get("single_sentence", False))
+    
+    def _build_prompts(self, article_content: str) -> Tuple[str, str, str]:
+        """
+        根据 persona 配置生成本次请求的提示词
+        
+        Args:
+            article_content: 文章内容
+            
+        Returns:
+            (模型名称, 系统提示词, 用户提示词)
+        """
+        # 格式化 user_prompt
+        # 优化：限制文章内容长度并合并空白，减少 token 数、提高生成速度
+        # 短文章不做切片复制；合并空白后排版不同的同一篇文章也能命中精确缓存
+        if len(article_content) > ARTICLE_PROMPT_CHARS:
+            article_content = article_content[:ARTICLE_PROMPT_CHARS]
+        snippet = _WS_RE.sub(" ", article_content).strip()
+        user_prompt = self._user_prompt_template.format(article_content=snippet)
+        return self._model_name, self._system_prompt, user_prompt
+    
+    def _remember_comment(self, cache_key: str, comment: str) -> None:
+        """写入评论精确缓存，超出容量时丢弃最久未用的条目"""
+        self._exact_cache[cache_key] = comment
+        if len(self._exact_cache) > COMMENT_CACHE_SIZE:
+            self._exact_cache.popitem(last=False)
     
     def generate_comment(
         self,
@@ -272,12 +568,8 @@ class LLMCommentGenerator:
         """
         MAX_RETRIES = 3
 
-        if not self.is_available():
-            logger.warning("LLM 客户端不可用")
-            return None
-
-        if not self.task_config:
-            logger.warning("配置未加载")
+        if not self._ready:
+            logger.warning(self._not_ready_reason)
             return None
 
         if not article_content or not article_content.strip():
@@ -285,57 +577,78 @@ class LLMCommentGenerator:
             return None
 
         try:
-            # 获取任务配置
-            task_config = self.task_config.get("task_comment_generation", {})
-            persona_config = task_config.get("default")
-
-            if not persona_config:
-                logger.warning("未找到默认 persona 配置")
-                return None
-
-            system_prompt = persona_config.get("system_prompt", "")
-            user_prompt_template = persona_config.get("user_prompt", "")
-
-            if not system_prompt or not user_prompt_template:
-                logger.warning("系统提示词或用户提示词为空")
-                return None
-
-            # 格式化 user_prompt
-            # 优化：限制文章内容长度，提高生成速度
-            # 对于评论生成任务，通常前 800 个字符已足够理解大意
-            # 进一步缩短以应对低配置机器
-            user_prompt = user_prompt_template.format(
-                article_content=article_content[:800]
-            )
-
-            # 获取模型
-            model_name = os.environ.get("OPENAI_MODEL", self._get_default_model())
+            model_name, system_prompt, user_prompt = self._build_prompts(article_content)
+
+            # 相同输入直接返回缓存的评论
+            cache_key = self._cache_key(model_name, system_prompt, user_prompt)
+            cached = self._exact_cache.get(cache_key)
+            if cached is not None:
+                self._exact_cache.move_to_end(cache_key)
+                logger.info(f"命中评论缓存: {cached}")
+                return cached
+
+            # 近似重复的文章复用评论（向量计算远比生成评论便宜）
+            query_vector = self._embed(article_content[:SEMANTIC_CACHE_CHARS])
+            if query_vector is not None:
+                cached = self._semantic_lookup(query_vector)
+                if cached is not None:
+                    return cached
+
+            # 后台预热仍在进行时稍等，避免与预热请求同时触发模型加载
+            if self._warmup_thread is not None and self._warmup_thread.is_alive():
+                self._warmup_thread.join(2.0)
+            # 模型加载完成前放宽超时，之后慢请求才尽早失败
+            timeout = COMMENT_TIMEOUT if self._model_warm else COMMENT_COLD_TIMEOUT
 
             # 调用 LLM API
             start_time = time.time()
-            logger.info(f"正在调用 LLM 生成评论 (模型: {model_name}, 输入长度: {len(article_content[:800])})...")
+            logger.info(f"正在调用 LLM 生成评论 (模型: {model_name}, 提示词长度: {len(user_prompt)})...")
 
-            response = self.client.chat.completions.create(
+            stream = self.client.chat.completions.create(
                 model=model_name,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
-                temperature=0.7,
-                max_tokens=60,  # 评论通常很短，减少生成token数
-                timeout=30.0,   # 30秒超时
+                temperature=COMMENT_TEMPERATURE,
+                max_tokens=COMMENT_MAX_TOKENS,
+                stop=COMMENT_STOP,
+                timeout=timeout,
+                extra_body=self._extra_body,
+                stream=True,
             )
 
+            # 逐段接收；单句模式下评论完整（够长且以句末标点结尾）后立即停止
+            parts: List[str] = []
+            length = 0
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                parts.append(delta)
+                length += len(delta)
+                tail = delta.rstrip()[-1:]
+                if (self._single_sentence and length >= STREAM_STOP_MIN_CHARS
+                        and tail and tail in STREAM_STOP_CHARS):
+                    stream.close()
+                    break
+
             elapsed = time.time() - start_time
             logger.info(f"LLM 生成耗时: {elapsed:.2f}s")
+            self._model_warm = True
 
-            comment = response.choices[0].message.content.strip()
+            comment = "".join(parts).strip().strip("\"'")
             logger.info(f"LLM 生成评论: {comment}")
+            
+            if comment:
+                self._remember_comment(cache_key, comment)
+                if query_vector is not None:
+                    self._semantic_store(query_vector, comment)
             return comment
 
         except Exception as e:
             error_msg = str(e)
-            model_name = os.environ.get("OPENAI_MODEL", self._get_default_model())
+            model_name = self._model_name
 
             # 检查是否是模型未找到的错误
             if "not found" in error_msg.lower() or "404" in error_msg:
@@ -359,56 +672,61 @@ class LLMCommentGenerator:
                 logger.error(f"LLM 请求失败，已重试 {MAX_RETRIES} 次，程序退出")
                 raise SystemExit(f"LLM 请求连续失败 {MAX_RETRIES} 次，程序退出")
     
+    def _start_warmup(self) -> None:
+        """在后台线程中预热模型，不阻塞初始化"""
+        self._warmup_result = {"success": False, "error": None}
+        self._warmup_thread = threading.Thread(target=self._do_warmup, daemon=True)
+        self._warmup_thread.start()
+
+    def _do_warmup(self) -> None:
+        """发送一个极简请求，触发模型加载到内存"""
+        try:
+            logger.info("正在预热 LLM 模型...")
+            start_time = time.time()
+            # 带上系统提示词：Ollama 会复用与上次请求相同的前缀，首篇评论可能少做一部分预填充
+            messages = [{"role": "user", "content": "hi"}]
+            if self._system_prompt:
+                messages.insert(0, {"role": "system", "content": self._system_prompt})
+            self.client.chat.completions.create(
+                model=self._model_name,
+                messages=messages,
+                max_tokens=1,
+                extra_body=self._extra_body,
+            )
+            logger.info(f"模型预热完成 (耗时: {time.time() - start_time:.2f}s)")
+            self._warmup_result["success"] = True
+            self._model_warm = True
+        except Exception as e:
+            self._warmup_result["error"] = e
+
     def warmup(self, timeout: float = 180.0) -> bool:
         """
-        预热模型（触发加载到内存）
+        等待模型预热完成（预热在初始化时已于后台开始）
         
         Args:
             timeout: 超时时间（秒）
         """
         if not self.is_available():
             return False
+        if self._warmup_thread is None:
+            self._start_warmup()
             
-        try:
-            logger.info("正在预热 LLM 模型...")
-            
-            # 使用 threading 来实现超时控制
-            import threading
-            result = {"success": False, "error": None}
-            
-            def _warmup_task():
-                try:
-                    start_time = time.time()
-                    # 发送一个极简请求
-                    self.client.chat.completions.create(
-                        model=os.environ.get("OPENAI_MODEL", self._get_default_model()),
-                        messages=[{"role": "user", "content": "hi"}],
-                        max_tokens=1
-                    )
-                    logger.info(f"模型预热完成 (耗时: {time.time() - start_time:.2f}s)")
-                    result["success"] = True
-                except Exception as e:
-                    result["error"] = e
-            
-            t = threading.Thread(target=_warmup_task)
-            t.daemon = True
-            t.start()
-            t.join(timeout)
+        self._warmup_thread.join(timeout)
+        
+        if self._warmup_thread.is_alive():
+            logger.warning(f"模型预热超时 ({timeout}s)，将跳过等待，后续可能会较慢")
+            return False
             
-            if t.is_alive():
-                logger.warning(f"模型预热超时 ({timeout}s)，将跳过等待，后续可能会较慢")
-                return False
-                
-            if result["error"]:
-                logger.warning(f"模型预热失败: {result['error']}")
-                return False
-                
-            return result["success"]
-        except Exception as e:
-            logger.warning(f"模型预热过程出错: {e}")
+        if self._warmup_result["error"]:
+            logger.warning(f"模型预热失败: {self._warmup_result['error']}")
             return False
+            
+        return self._warmup_result["success"]
 
     def cleanup(self) -> None:
         """清理资源"""
+        _save_exact_cache()
+        if self.client is not None:
+            self.client.close()
         if self.ollama_manager:
             self.ollama_manager.cleanup()